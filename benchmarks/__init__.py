@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+Performance benchmarks of syncing (not shipped with the package).
+"""
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+Benchmark of the `save_excel` engines (time and peak memory increase).
+
+Each engine runs in a fresh process to measure its own peak resident memory
+(Unix only).
+
+Usage::
+
+    $ python -m benchmarks.bench_excel_writer [<rows>]
+"""
+import os
+import sys
+import time
+import resource
+import tempfile
+import numpy as np
+import concurrent.futures as cf
+from syncing.model.dataset import DataSet
+from syncing.rw.write import save_excel
+
+
+def outputs(rows, columns=4, sets=2):
+    rng = np.random.default_rng(0)
+    return {'shifts': {'data-%d' % i: float(i) for i in range(1, sets)},
+            'resampled': {'data-%d' % i: DataSet(rng.normal(
+                size=(rows, columns)
+            ), ['x'] + ['y%d' % j for j in range(1, columns)])
+                for i in range(sets)}}
+
+
+def _measure(rows, engine, fpath):
+    data = outputs(rows)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t = time.perf_counter()
+    save_excel(fpath, data, excel_engine=engine)
+    t = time.perf_counter() - t
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+    return t, rss / 1024, os.path.getsize(fpath) / 2 ** 20
+
+
+def run(rows=1000000, engines=('stream', 'pandas')):
+    print('%10s %8s %12s %16s %12s' % (
+        'rows', 'engine', 'time [s]', 'peak [MB]', 'file [MB]'
+    ))
+    with tempfile.TemporaryDirectory() as tmp:
+        for engine in engines:
+            fpath = os.path.join(tmp, '%s.xlsx' % engine)
+            with cf.ProcessPoolExecutor(1) as executor:
+                res = executor.submit(_measure, rows, engine, fpath).result()
+            print('%10d %8s %12.2f %16.1f %12.1f' % ((rows, engine) + res))
+
+
+if __name__ == '__main__':
+    run(*map(int, sys.argv[1:2]))
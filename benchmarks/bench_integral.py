@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+Benchmark of the `integral` interpolation method.
+
+Usage::
+
+    $ python -m benchmarks.bench_integral
+"""
+import timeit
+import numpy as np
+from syncing.model.interp import integral_interpolation
+
+
+def run(sizes=(1000, 10000, 100000, 1000000), columns=(1, 10), repeat=3):
+    rng = np.random.default_rng(0)
+    print('%10s %8s %12s %14s' % (
+        'samples', 'columns', 'time [s]', 'us/sample'
+    ))
+    for n in sizes:
+        xp = np.cumsum(rng.uniform(.5, 1.5, n))
+        x = np.linspace(xp[0], xp[-1], n)
+        for m in columns:
+            fp = rng.normal(size=(n, m)) if m > 1 else rng.normal(size=n)
+            t = min(timeit.repeat(
+                lambda: integral_interpolation(x, xp, fp), number=1,
+                repeat=repeat
+            ))
+            print('%10d %8d %12.4f %14.4f' % (n, m, t, t / n * 1e6))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+Benchmark of the package import time and of the CLI cold start.
+
+Each command runs in a fresh interpreter. The best time of each command is
+compared with the regression threshold and the exit code is 1 if any of them
+exceeds it.
+
+Usage::
+
+    $ python -m benchmarks.bench_startup [<threshold-ms>]
+"""
+import sys
+import time
+import subprocess
+
+COMMANDS = {
+    'python': [],
+    'import syncing': ['-c', 'import syncing'],
+    'import syncing.cli': ['-c', 'import syncing.cli'],
+    'syncing --version': ['-m', 'syncing.cli', '--version'],
+    'syncing --help': ['-m', 'syncing.cli', '--help'],
+}
+
+
+def _best(args, repeat):
+    args = [sys.executable] + (args or ['-c', 'pass'])
+    res = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+        res.append(time.perf_counter() - t)
+    return min(res) * 1000
+
+
+def run(threshold=300, repeat=10):
+    print('%20s %12s' % ('command', 'time [ms]'))
+    failed = 0
+    for name, args in COMMANDS.items():
+        t = _best(args, repeat)
+        slow = bool(args) and t > threshold  # The bare interpreter is a ref.
+        failed |= slow
+        print('%20s %12.1f%s' % (name, t, slow and ' > %d' % threshold or ''))
+    return failed
+
+
+if __name__ == '__main__':
+    sys.exit(run(*map(int, sys.argv[1:2])))
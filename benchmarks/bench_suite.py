@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+Benchmark suite of the model (shifts and interpolation methods) and of the I/O
+functions on synthetic data-sets (see :mod:`benchmarks.synthetic`).
+
+Each case records the best time of the repetitions and the peak memory
+allocated while it runs (measured with `tracemalloc` in a separate run). The
+results can be saved as a baseline and later runs compared with it: the exit
+code is 1 if any case is slower or uses more memory than the baseline beyond
+the tolerance.
+
+Usage::
+
+    $ python -m benchmarks.bench_suite --save baseline.json
+    $ python -m benchmarks.bench_suite --compare baseline.json
+    $ python -m benchmarks.bench_suite --sheets 60 --samples 1000 -k 'shifts'
+    $ python -m benchmarks.bench_suite --dtype float32
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import numpy as np
+
+
+def cases(data, fpath):
+    """
+    Defines the benchmark cases.
+
+    :param data:
+        Data-sets (the first one is the reference).
+    :type data: dict[str, syncing.model.dataset.DataSet]
+
+    :param fpath:
+        Path (without extension) of the files written and read.
+    :type fpath: str
+
+    :return:
+        Case names and functions, the writers are before the readers of the
+        same file.
+    :rtype: collections.Iterable[(str, callable)]
+    """
+    from syncing.model import _compute_shifts
+    from syncing.model.interp import METHODS
+    from syncing.rw.read import read_excel, read_json
+    from syncing.rw.write import save_excel, save_json
+    signals = [(v['x'], v['y']) for v in data.values()]
+    for search in ('full', 'pyramid'):
+        yield 'shifts[%s]' % search, lambda s=search: _compute_shifts(
+            *signals, search=s
+        )
+    ref, ds = list(data.values())[:2]
+    x, xp, fp = ref['x'], ds['x'], ds.values[:, 1:]
+    for name, method in METHODS.items():
+        yield 'interp[%s]' % name, lambda m=method: m(x, xp=xp, fp=fp)
+    outputs = {'shifts': dict.fromkeys(list(data)[1:], 0.), 'resampled': data}
+    for ext, save, read in (('json', save_json, read_json),
+                            ('xlsx', save_excel, read_excel)):
+        path = '%s.%s' % (fpath, ext)
+        yield save.__name__, lambda s=save, p=path: s(p, outputs)
+        kw = {'excel_cache': 'off'} if ext == 'xlsx' else {}
+        yield read.__name__, lambda r=read, p=path, k=kw: r(p, **k)
+
+
+def measure(func, repeat=3):
+    """
+    Measures the best time and the peak memory allocation of a function.
+
+    The function is called once before measuring, to exclude lazy imports and
+    caches warm-up.
+
+    :param func:
+        Function to measure.
+    :type func: callable
+
+    :param repeat:
+        Number of timed runs.
+    :type repeat: int
+
+    :return:
+        Best time [s] and peak memory allocation [MB].
+    :rtype: float, float
+    """
+    func()
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 2 ** 20
+
+
+def compare(results, baseline, tolerance=.2):
+    """
+    Compares the results with the baseline.
+
+    :param results:
+        Results of the cases, like `{"<case>": {"time": .., "peak": ..}}`.
+    :type results: dict
+
+    :param baseline:
+        Baseline results (same format).
+    :type baseline: dict
+
+    :param tolerance:
+        Relative increase of time or peak memory accepted.
+    :type tolerance: float
+
+    :return:
+        Relative changes of time and peak memory, and regression flag, for
+        each case in both results.
+    :rtype: dict[str, (float, float, bool)]
+    """
+    res = {}
+    for case, v in results.items():
+        if case not in baseline:
+            continue
+        b = baseline[case]
+        dt = v['time'] / b['time'] - 1 if b['time'] else 0.
+        dm = v['peak'] / b['peak'] - 1 if b['peak'] else 0.
+        # Peak changes below 1 MB are noise of the allocator.
+        slow = dt > tolerance or dm > tolerance and v['peak'] - b['peak'] > 1
+        res[case] = dt, dm, slow
+    return res
+
+
+def run(sheets=3, channels=4, samples=100000, irregularity=.1, repeat=3,
+        pattern='', save=None, baseline=None, tolerance=.2, dtype='float64'):
+    from .synthetic import generate
+    from syncing.model.dataset import DataSet
+    params = dict(sheets=sheets, channels=channels, samples=samples,
+                  irregularity=irregularity)
+    data = {
+        k: DataSet(v.values, v.columns, dtype)
+        for k, v in generate(**params)[0].items()
+    }
+    params['dtype'] = dtype
+    base = {}
+    if baseline:
+        with open(baseline) as f:
+            base = json.load(f)
+        if base['params'] != params:
+            print('Warning: baseline parameters %r differ.' % base['params'])
+        base = base['results']
+
+    print('%20s %12s %12s %10s %10s' % (
+        'case', 'time [ms]', 'peak [MB]', 'time', 'peak'
+    ))
+    results, failed = {}, 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for case, func in cases(data, os.path.join(tmp, 'data')):
+            if not re.search(pattern, case):
+                if case.startswith('save_'):  # Writes the file to read.
+                    func()
+                continue
+            t, peak = measure(func, repeat)
+            results[case] = {'time': t, 'peak': peak}
+            line = '%20s %12.2f %12.2f' % (case, t * 1000, peak)
+            if case in base:
+                dt, dm, slow = compare(
+                    {case: results[case]}, base, tolerance
+                )[case]
+                failed |= slow
+                line += ' %+9.1f%% %+9.1f%%%s' % (
+                    dt * 100, dm * 100, slow and '  REGRESSION' or ''
+                )
+            print(line)
+    if save:
+        with open(save, 'w') as f:
+            json.dump({
+                'params': params, 'results': results, 'system': {
+                    'python': platform.python_version(),
+                    'numpy': np.__version__, 'machine': platform.machine(),
+                    'processor': platform.processor()
+                }
+            }, f, indent=2)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.bench_suite',
+        description='Benchmark suite of the model and of the I/O functions.'
+    )
+    parser.add_argument('--sheets', type=int, default=3,
+                        help='Number of data-sets (default: 3).')
+    parser.add_argument('--channels', type=int, default=4,
+                        help='Variables of each data-set (default: 4).')
+    parser.add_argument('--samples', type=int, default=100000,
+                        help='Samples of each data-set (default: 100000).')
+    parser.add_argument('--irregularity', type=float, default=.1,
+                        help='Relative variation of the sampling step '
+                             '(default: 0.1).')
+    parser.add_argument('--dtype', default='float64',
+                        choices=('float64', 'float32'),
+                        help='Float type of the data-sets (default: float64).')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs (default: 3).')
+    parser.add_argument('-k', '--pattern', default='',
+                        help='Regex to select the cases.')
+    parser.add_argument('--save', help='File path of the results (`.json`).')
+    parser.add_argument('--compare', dest='baseline',
+                        help='File path of the baseline results (`.json`).')
+    parser.add_argument('--tolerance', type=float, default=.2,
+                        help='Relative increase accepted (default: 0.2).')
+    return run(**vars(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+Synthetic data-sets generator for the benchmarks.
+
+All data-sets sample the same smooth signal (a sum of sines) with a known
+time shift from the reference one.
+
+Example::
+
+    >>> data, shifts = generate(sheets=3, channels=2, samples=100)
+    >>> sorted(data), list(data['ref'])
+    (['ref', 'set-1', 'set-2'], ['x', 'y', 'c1'])
+"""
+import numpy as np
+from syncing.model.dataset import DataSet
+
+
+def generate(sheets=3, channels=4, samples=10000, irregularity=0., seed=0,
+             step=.1):
+    """
+    Generates synthetic data-sets.
+
+    :param sheets:
+        Number of data-sets (i.e., the reference plus `sheets - 1` shifted).
+    :type sheets: int
+
+    :param channels:
+        Number of variables of each data-set besides the x-axis (i.e., "y" and
+        `channels - 1` extra signals).
+    :type channels: int
+
+    :param samples:
+        Number of samples of each data-set.
+    :type samples: int
+
+    :param irregularity:
+        Relative random variation of the sampling step (0: regular sampling,
+        e.g. 0.5: each step varies by up to ±50%).
+    :type irregularity: float
+
+    :param seed:
+        Seed of the random generator.
+    :type seed: int
+
+    :param step:
+        Mean sampling step of the x-axis.
+    :type step: float
+
+    :return:
+        Data-sets (the first one is the reference `ref`) and their true shifts.
+    :rtype: dict[str, syncing.model.dataset.DataSet], dict[str, float]
+    """
+    rng = np.random.default_rng(seed)
+    freq = rng.uniform(.01, .5, (channels, 8)) / step / 10
+    phase = rng.uniform(0, 2 * np.pi, (channels, 8))
+
+    def signal(t):
+        return np.sin(
+            2 * np.pi * t[:, None, None] * freq + phase
+        ).sum(-1)
+
+    columns = ['x', 'y'] + ['c%d' % i for i in range(1, channels)]
+    data, shifts = {}, {}
+    for i in range(sheets):
+        name = i and 'set-%d' % i or 'ref'
+        shift = i and float(rng.uniform(-50, 50) * step) or 0.
+        dx = step * (1 + irregularity * rng.uniform(-1, 1, samples))
+        x = np.cumsum(dx) - dx[0]
+        values = np.empty((samples, channels + 1), order='F')
+        values[:, 0], values[:, 1:] = x + shift, signal(x)
+        data[name] = DataSet(values, columns)
+        if i:
+            shifts[name] = shift
+    return data, shifts
@@ -83,6 +83,7 @@ if __name__ == '__main__':
 
     extras = {
         'cli': ['click', 'click-log'],
+        'parquet': ['pyarrow'],
         'plot': ['graphviz', 'regex', 'flask', 'Pygments', 'jinja2', 'docutils']
     }
     # noinspection PyTypeChecker
@@ -96,7 +97,8 @@ if __name__ == '__main__':
         name=name,
         version=proj_ver,
         packages=find_packages(exclude=[
-            'tests', 'tests.*', 'doc', 'doc.*', 'requirements'
+            'tests', 'tests.*', 'doc', 'doc.*', 'requirements', 'benchmarks',
+            'benchmarks.*'
         ]),
         url=url,
         project_urls=project_urls,
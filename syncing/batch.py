@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+It contains functions to synchronise many input files with a worker pool.
+"""
+import time
+import functools
+import os.path as osp
+
+#: Inputs of the processing model used only to read the input files.
+READ_INPUTS = (
+    'input_fpath', 'header', 'sets_mapping_fpath', 'labels_fpath',
+    'methods_fpath', 'data_names', 'excel_cache', 'excel_cache_dir', 'dtype'
+)
+
+
+def read_manifest(manifest_fpath):
+    """
+    Reads the input/output file pairs from a manifest.
+
+    :param manifest_fpath:
+        Manifest file path. A `.json` file is like `{"<input>": "<output>"}` or
+        `[["<input>", "<output>"], ...]`, otherwise it is a CSV file with two
+        columns (input and output).
+    :type manifest_fpath: str
+
+    :return:
+        Input/output file pairs.
+    :rtype: list[tuple[str, str]]
+    """
+    with open(manifest_fpath, newline='') as f:
+        if manifest_fpath.lower().endswith('.json'):
+            import json
+            pairs = json.load(f)
+            pairs = pairs.items() if isinstance(pairs, dict) else pairs
+        else:
+            import csv
+            pairs = [row for row in csv.reader(f) if row]
+    return [tuple(v) for v in pairs]
+
+
+def define_jobs(input_files=(), output_dir='.', output_ext='json',
+                manifest_fpath=None):
+    """
+    Defines the input/output file pairs of a batch.
+
+    :param input_files:
+        Input file paths or glob patterns.
+    :type input_files: list[str]
+
+    :param output_dir:
+        Directory of the output files of `input_files`.
+    :type output_dir: str
+
+    :param output_ext:
+        Extension of the output files of `input_files`.
+    :type output_ext: str
+
+    :param manifest_fpath:
+        Manifest file path (see :func:`read_manifest`).
+    :type manifest_fpath: str
+
+    :return:
+        Input/output file pairs.
+    :rtype: list[tuple[str, str]]
+    """
+    import glob
+    jobs = read_manifest(manifest_fpath) if manifest_fpath else []
+    for pattern in input_files:
+        for fpath in sorted(glob.glob(pattern)) or [pattern]:
+            name = osp.splitext(osp.basename(fpath.rstrip('/\\')))[0]
+            jobs.append((fpath, osp.join(
+                output_dir, '%s.%s' % (name, output_ext)
+            )))
+    return jobs
+
+
+@functools.lru_cache(None)
+def _model():
+    from syncing.process import dsp
+    return dsp.register()
+
+
+def warm_up():
+    """
+    Imports the modules and builds the processing model of the worker.
+    """
+    import pandas  # Loaded lazily by the readers and the writers.
+    import scipy.interpolate  # Loaded lazily by the interpolation methods.
+    from syncing.model import interp
+    _model()
+
+
+def read_inputs(inputs):
+    """
+    Reads and parses the data of an input file (first stage of a job).
+
+    :param inputs:
+        Inputs of the processing model.
+    :type inputs: dict
+
+    :return:
+        Inputs of the processing model with the parsed data instead of the
+        input file.
+    :rtype: dict
+    """
+    outputs = ['data', 'reference_name']
+    outputs += [k for k, f in (('labels', 'labels_fpath'),
+                               ('methods', 'methods_fpath')) if f in inputs]
+    sol = _model().dispatch(inputs, outputs)
+    res = {k: v for k, v in inputs.items() if k not in READ_INPUTS}
+    res.update({k: sol[k] for k in outputs})
+    return res
+
+
+def write_outputs(inputs):
+    """
+    Synchronises the parsed data and writes the output file (second stage of
+    a job).
+
+    :param inputs:
+        Inputs of the processing model returned by :func:`read_inputs`.
+    :type inputs: dict
+
+    :return:
+        File path where output are written.
+    :rtype: str
+    """
+    return _model().dispatch(inputs, ['written'])['written']
+
+
+def _timed(func, *args):
+    # Returns the result, the error, and the execution time of the function.
+    start = time.perf_counter()
+    try:
+        return func(*args), None, time.perf_counter() - start
+    except Exception as ex:
+        return None, ex, time.perf_counter() - start
+
+
+def _status(inputs, error, elapsed):
+    error = getattr(error, 'ex', None) or error  # Cause of `DispatcherError`.
+    return {
+        'input': inputs['input_fpath'], 'output': inputs['output_fpath'],
+        'status': 'failed' if error else 'ok',
+        'error': error and '%s: %s' % (type(error).__name__, error),
+        'time': elapsed
+    }
+
+
+def run_job(inputs):
+    """
+    Synchronises an input file (both stages), without raising errors.
+
+    :param inputs:
+        Inputs of the processing model.
+    :type inputs: dict
+
+    :return:
+        Job status.
+    :rtype: dict
+    """
+    return _status(inputs, *_timed(
+        lambda: write_outputs(read_inputs(inputs))
+    )[1:])
+
+
+def run_isolated(inputs):
+    """
+    Synchronises an input file (both stages) in a new worker process, hence
+    a crash of the worker (e.g., out of memory) fails only this job.
+
+    :param inputs:
+        Inputs of the processing model.
+    :type inputs: dict
+
+    :return:
+        Job status.
+    :rtype: dict
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(1, initializer=warm_up) as pool:
+        status, error, elapsed = _timed(
+            lambda: pool.submit(run_job, inputs).result()
+        )
+    return status or _status(inputs, error, elapsed)
+
+
+def _sequential(jobs):
+    # The next file is read in background while the current one is computed.
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(1) as reader:
+        future = jobs and reader.submit(_timed, read_inputs, jobs[0])
+        for i, inputs in enumerate(jobs):
+            parsed, error, elapsed = future.result()
+            if i + 1 < len(jobs):
+                future = reader.submit(_timed, read_inputs, jobs[i + 1])
+            if error is None:
+                _, error, t = _timed(write_outputs, parsed)
+                elapsed += t
+            yield _status(inputs, error, elapsed)
+
+
+def run_batch(jobs, inputs=None, workers=0):
+    """
+    Synchronises a batch of input files with a persistent worker pool.
+
+    A failed file does not stop the batch, its error is reported in the
+    status. If a worker dies (e.g., out of memory), the jobs that did not
+    complete are run again, each one in its own worker, to find the one that
+    crashed it.
+
+    :param jobs:
+        Input/output file pairs.
+    :type jobs: list[tuple[str, str]]
+
+    :param inputs:
+        Inputs of the processing model shared by all jobs (e.g., labels and
+        methods file paths, interpolation method).
+    :type inputs: dict
+
+    :param workers:
+        Number of worker processes. If 0, it is the number of CPUs. If 1, the
+        files are processed in the current process, reading the next file
+        while the current one is computed.
+    :type workers: int
+
+    :return:
+        Job statuses in the completion order.
+    :rtype: collections.Iterable[dict]
+    """
+    jobs = [dict(inputs or {}, input_fpath=i, output_fpath=o) for i, o in jobs]
+    if workers == 1:
+        warm_up()
+        yield from _sequential(jobs)
+        return
+    from concurrent.futures import (
+        ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    )
+    from concurrent.futures.process import BrokenProcessPool
+    broken = []
+    with ProcessPoolExecutor(workers or None, initializer=warm_up) as pool:
+        futures = {pool.submit(run_job, j): j for j in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                broken.append(futures[future])
+    if broken:
+        import os
+        with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+            futures = [pool.submit(run_isolated, j) for j in broken]
+            for future in as_completed(futures):
+                yield future.result()
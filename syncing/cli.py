@@ -14,11 +14,10 @@ Define the command line interface.
 """
 import click
 import logging
+import functools
 import click_log
 import schedula as sh
-import syncing
 from syncing._version import __version__
-from syncing.model.interp import METHODS
 
 log = logging.getLogger('syncing.cli')
 
@@ -36,7 +35,32 @@ class _Logger(logging.Logger):
 
 logger = _Logger('cli')
 click_log.basic_config(logger)
-_process = sh.SubDispatch(syncing.dsp, ['written'], output_type='value')
+
+
+@functools.lru_cache(None)
+def _dispatch():
+    # The processing model is imported and built only when a command runs.
+    from syncing.process import dsp
+    return sh.SubDispatch(dsp, ['written'], output_type='value')
+
+
+def _process(inputs, verbose=False):
+    return _dispatch()(inputs, _verbose=verbose)
+
+
+class _MethodChoice(click.Choice):
+    # Interpolation methods, loaded only to parse or to document the option.
+    def __init__(self):
+        super(_MethodChoice, self).__init__(())
+
+    @property
+    def choices(self):
+        from syncing.model.interp import METHODS
+        return tuple(METHODS)
+
+    @choices.setter
+    def choices(self, value):
+        pass
 
 
 @click.group(
@@ -64,68 +88,315 @@ def template(output_file='template.xlsx'):
     return _process({'template_fpath': output_file})
 
 
+#: Options shared by the `sync` and `sync-batch` commands.
+_SYNC_OPTIONS = [
+    click.option(
+        '-R', '--reference-name', help='Reference data-set name.',
+        show_default=True
+    ),
+    click.option(
+        '-x', '--x-label', default=['x'], multiple=True, show_default=True,
+        help='Default `var-name` of the common x-axis to synchronise and '
+             're-sampled the data-sets.'
+    ),
+    click.option(
+        '-y', '--y-label', default=['y'], multiple=True, show_default=True,
+        help='Default `var-name` of the common y-axis to synchronise the '
+             'data-sets.'
+    ),
+    click.option(
+        '-I', '--interpolation-method', default='linear',
+        type=_MethodChoice(), show_default=True,
+        help='Interpolation method used to re-sample all data-sets.'
+    ),
+    click.option(
+        '-S', '--sets-mapping-fpath', type=click.Path(exists=True),
+        help='File path (`.json`) of data-sets mapping definition.\n It is '
+             'like`{"<set-name>": {"<new-name>": "<old-name>", ...}, ...}`.'
+    ),
+    click.option(
+        '-L', '--labels-fpath', type=click.Path(exists=True),
+        help='File path (`.json`) of `reference-labels` (i.e., "x", "y").'
+             '\nIt is like `{"<set-name>": {"x": "<x-label>", "y": '
+             '"<y-label>"}, ...}`.'
+    ),
+    click.option(
+        '-M', '--methods-fpath', type=click.Path(exists=True),
+        help='File path (`.json`) of interpolation methods.\nIt is like '
+             '`{"<set-name>": {"<var-name>": "<interp>", ...}, ...}`.'
+    ),
+    click.option(
+        '-NS', '--no-sync', is_flag=True,
+        help='Executes only the re-sampling without data synchronisation.'
+    ),
+    click.option(
+        '--shift-search', default='full', show_default=True,
+        type=click.Choice(['full', 'pyramid']),
+        help='Shift search strategy (`pyramid`: coarse-to-fine search, faster '
+             'for long signals).'
+    ),
+    click.option(
+        '--max-shift', type=click.FloatRange(min=0),
+        help='Maximum absolute shift from the reference data-set (same units '
+             'of the x-axis).'
+    ),
+    click.option(
+        '-j', '--jobs', type=int, default=1, show_default=True,
+        help='Number of workers computing the shifts in parallel (0: number '
+             'of CPUs).'
+    ),
+    click.option(
+        '--executor', default='thread', show_default=True,
+        type=click.Choice(['thread', 'process']),
+        help='Pool type of the workers computing the shifts.'
+    ),
+    click.option(
+        '--chunk-size', type=int,
+        help='Number of reference samples re-sampled at once (out-of-core '
+             're-sampling with bounded memory).'
+    ),
+    click.option(
+        '--cache-dir', type=click.Path(file_okay=False, writable=True),
+        help='Directory of the result cache. Shifts and re-sampled data-sets '
+             'whose inputs are unchanged are loaded from it.'
+    ),
+    click.option(
+        '--cache-size', type=float, default=1024, show_default=True,
+        help='Maximum size [MB] of the result cache (least recently used '
+             'results are evicted).'
+    ),
+    click.option(
+        '--dtype', default='float64', show_default=True,
+        type=click.Choice(['float64', 'float32']),
+        help='Float type of the data-sets from the readers to the writers '
+             '(`float32`: half memory, x-axes keep ~7 significant digits and '
+             'shifts may differ by a tenth of the sampling step).'
+    ),
+    click.option(
+        '-H', '--header', multiple=True, type=int,
+        help='Row (0-indexed) to use for the column labels.'
+    ),
+    click.option(
+        '--excel-engine', default='stream', show_default=True,
+        type=click.Choice(['stream', 'pandas']),
+        help='Engine to read/write the `.xlsx` sheets (`stream`: rows '
+             'streamed straight from/to NumPy).'
+    ),
+    click.option(
+        '--excel-cache', default='off', show_default=True,
+        type=click.Choice(['on', 'off', 'refresh']),
+        help='Usage of the parsed-input sidecar of `.xlsx` inputs (`on`: '
+             'loaded if the workbook is unchanged, `refresh`: rewritten).'
+    ),
+    click.option(
+        '--excel-cache-dir', type=click.Path(file_okay=False, writable=True),
+        help='Directory of the parsed-input sidecars of `.xlsx` inputs '
+             '(default: `excel` in `$SYNCING_CACHE_DIR` or in '
+             '`~/.cache/syncing`).'
+    ),
+    click.option(
+        '--json-precision', type=int,
+        help='Significant digits of the floats written in `.json` outputs '
+             '(default: shortest exact representation).'
+    ),
+    click.option(
+        '--json-compact', is_flag=True,
+        help='Write `.json` outputs without spaces after the separators.'
+    ),
+]
+
+
+def _sync_options(func):
+    for option in reversed(_SYNC_OPTIONS):
+        func = option(func)
+    return func
+
+
+def _sync_inputs(kw):
+    # Options left to their declared defaults (e.g., unset flags) are not
+    # forwarded, so the model defaults apply.
+    from click.core import ParameterSource
+    ctx = click.get_current_context()
+    kw = {k: v for k, v in kw.items() if v is not None and (
+        ctx.get_parameter_source(k) is not ParameterSource.DEFAULT
+    )}
+    for k in ('x_label', 'y_label'):
+        if k in kw:
+            kw[k] = sh.bypass(*kw[k])
+    return kw
+
+
 @cli.command('sync', short_help='Synchronise and re-sample whole data-sets.')
 @click.argument('input-file', type=click.Path(exists=True), nargs=1)
 @click.argument('output-file', type=click.Path(writable=True), nargs=1)
 @click.argument('data-names', nargs=-1)
+@_sync_options
 @click.option(
-    '-R', '--reference-name', help='Reference data-set name.',
-    show_default=True
+    '--profile', type=click.Path(dir_okay=False, writable=True),
+    help='File path (`.json`) of the profiling report (wall time, CPU time, '
+         'and peak allocation of each model function and data-set). A short '
+         'table is printed on stderr.'
+)
+@click_log.simple_verbosity_option(logger)
+def sync(input_file, output_file, profile, **kw):
+    """
+    Synchronise and re-sample data-sets defined in INPUT_FILE and writes shifts
+    and synchronised data into the OUTPUT_FILE.
+
+    INPUT_FILE: Data-sets input file (format: .xlsx, .json, .npy directory,
+    .parquet file/directory, .csv file/directory).
+
+    OUTPUT_FILE: output file (format: .xlsx, .json, .npy directory,
+    .parquet directory, .csv directory).
+
+    DATA_NAMES: to filter out the data sets to synchronise.
+    """
+    kw = _sync_inputs(kw)
+    kw['input_fpath'], kw['output_fpath'] = input_file, output_file
+    if not profile:
+        return _process(kw)
+    from syncing.profiling import Profiler
+    with Profiler() as profiler:
+        res = _process(kw, profiler)
+    profiler.save(profile)
+    click.echo(profiler.table(), err=True)
+    return res
+
+
+@cli.command(
+    'sync-batch', short_help='Synchronise and re-sample many input files.'
 )
+@click.argument('input-files', nargs=-1)
 @click.option(
-    '-x', '--x-label', default=['x'], multiple=True, show_default=True,
-    help='Default `var-name` of the common x-axis to synchronise and re-sampled'
-         ' the data-sets.'
+    '-m', '--manifest', type=click.Path(exists=True),
+    help='File path (`.json` or `.csv`) of input/output file pairs.\nIt is '
+         'like `{"<input-file>": "<output-file>", ...}` or a CSV with two '
+         'columns.'
 )
 @click.option(
-    '-y', '--y-label', default=['y'], multiple=True, show_default=True,
-    help='Default `var-name` of the common y-axis to synchronise the data-sets.'
+    '-o', '--output-dir', default='.', show_default=True,
+    type=click.Path(file_okay=False, writable=True),
+    help='Directory of the output files of INPUT_FILES.'
 )
 @click.option(
-    '-I', '--interpolation-method', default='linear',
-    type=click.Choice(METHODS), show_default=True,
-    help='Interpolation method used to re-sample all data-sets.'
+    '-e', '--output-ext', default='json', show_default=True,
+    type=click.Choice(['xlsx', 'json', 'npy', 'parquet', 'csv']),
+    help='Extension of the output files of INPUT_FILES.'
 )
 @click.option(
-    '-S', '--sets-mapping-fpath', type=click.Path(exists=True),
-    help='File path (`.json`) of data-sets mapping definition.\n It is like'
-         '`{"<set-name>": {"<new-name>": "<old-name>", ...}, ...}`.'
+    '-D', '--data-names', multiple=True,
+    help='Data name to filter out the data sets to synchronise.'
 )
 @click.option(
-    '-L', '--labels-fpath', type=click.Path(exists=True),
-    help='File path (`.json`) of `reference-labels` (i.e., "x", "y").\nIt is '
-         'like `{"<set-name>": {"x": "<x-label>", "y": "<y-label>"}, ...}`.'
+    '-w', '--workers', type=int, default=0, show_default=True,
+    help='Number of worker processes (0: number of CPUs, 1: no pool).'
 )
 @click.option(
-    '-M', '--methods-fpath', type=click.Path(exists=True),
-    help='File path (`.json`) of interpolation methods.\nIt is like '
-         '`{"<set-name>": {"<var-name>": "<interp>", ...}, ...}`.'
+    '--summary', type=click.Path(writable=True),
+    help='File path (`.json`) of the per-file status summary.'
 )
+@_sync_options
+@click_log.simple_verbosity_option(logger)
+def sync_batch(input_files, manifest, output_dir, output_ext, workers,
+               summary, **kw):
+    """
+    Synchronise and re-sample the data-sets of many INPUT_FILES with a
+    persistent worker pool, reporting the status of each file. A failed file
+    does not stop the batch.
+
+    INPUT_FILES: Data-sets input files or glob patterns. The output files are
+    saved in the OUTPUT_DIR with the same name and the OUTPUT_EXT extension.
+    """
+    from syncing import batch
+    jobs = batch.define_jobs(input_files, output_dir, output_ext, manifest)
+    res = []
+    for status in batch.run_batch(jobs, _sync_inputs(kw), workers):
+        res.append(status)
+        error = status['error'] and ' (%s)' % status['error'] or ''
+        click.echo('%6s %8.2fs %s -> %s%s' % (
+            status['status'], status['time'], status['input'],
+            status['output'], error
+        ))
+    failed = sum(v['status'] != 'ok' for v in res)
+    click.echo('%d files: %d ok, %d failed.' % (
+        len(res), len(res) - failed, failed
+    ))
+    if summary:
+        import json
+        with open(summary, 'w') as f:
+            json.dump(res, f, indent=2)
+    if failed:
+        raise click.exceptions.Exit(1)
+
+
+@cli.command('purge-cache', short_help='Removes the cached results.')
 @click.option(
-    '-NS', '--no-sync', is_flag=True,
-    help='Executes only the re-sampling without data synchronisation.'
+    '--excel-cache-dir', type=click.Path(file_okay=False),
+    help='Directory of the parsed-input sidecars of `.xlsx` inputs '
+         '(default: `excel` in `$SYNCING_CACHE_DIR` or `~/.cache/syncing`).'
 )
 @click.option(
-    '-H', '--header', multiple=True, type=int,
-    help='Row (0-indexed) to use for the column labels.'
+    '--cache-dir', type=click.Path(file_okay=False),
+    help='Directory of the result cache to remove as well.'
 )
 @click_log.simple_verbosity_option(logger)
-def sync(input_file, output_file, **kw):
+def purge_cache(excel_cache_dir, cache_dir):
     """
-    Synchronise and re-sample data-sets defined in INPUT_FILE and writes shifts
-    and synchronised data into the OUTPUT_FILE.
+    Removes the parsed-input sidecars of the Excel workbooks and, if
+    CACHE_DIR is given, the result cache.
+    """
+    import shutil
+    from syncing.rw.read import purge_excel_cache
+    click.echo('Removed %s' % purge_excel_cache(excel_cache_dir))
+    if cache_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        click.echo('Removed %s' % cache_dir)
 
-    INPUT_FILE: Data-sets input file (format: .xlsx, .json).
 
-    OUTPUT_FILE: output file (format: .xlsx, .json).
+@cli.command('serve', short_help='Runs a local server of sync jobs.')
+@click.option(
+    '--host', default='127.0.0.1', show_default=True,
+    help='Host address of the server.'
+)
+@click.option(
+    '-p', '--port', type=int, default=8765, show_default=True,
+    help='Port of the server.'
+)
+@click.option(
+    '--socket', type=click.Path(dir_okay=False, writable=True),
+    help='Unix socket path of the server (instead of host and port).'
+)
+@click.option(
+    '-w', '--workers', type=int, default=0, show_default=True,
+    help='Number of worker processes (0: number of CPUs).'
+)
+@click.option(
+    '--queue-size', type=int,
+    help='Number of jobs waiting for a worker, beyond which the requests are '
+         'rejected with `503` (default: number of workers).'
+)
+@click_log.simple_verbosity_option(logger)
+def serve(host, port, socket, workers, queue_size):
+    """
+    Runs a local HTTP server that synchronises data-sets with a pool of warm
+    workers.
 
-    DATA_NAMES: to filter out the data sets to synchronise.
+    Jobs are sent with `POST /sync` and a JSON body with the parameters of
+    `syncing sync` (e.g., `{"input_fpath": "data.xlsx", "output_fpath":
+    "out.json"}`). Without `output_fpath` the response contains the shifts and
+    the re-sampled data-sets.
     """
-    kw['x_label'] = sh.bypass(*kw['x_label'])
-    kw['y_label'] = sh.bypass(*kw['y_label'])
-    kw = {k: v for k, v in kw.items() if v}
-    kw['input_fpath'], kw['output_fpath'] = input_file, output_file
-    return _process(kw)
+    from syncing.server import SyncServer
+    server = SyncServer(socket or (host, port), workers, queue_size)
+    click.echo('Serving on %s (%d workers).' % (
+        socket or 'http://%s:%d' % server.server_address[:2], server.workers
+    ))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 if __name__ == '__main__':
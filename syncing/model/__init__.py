@@ -17,7 +17,10 @@ Sub-Modules:
     :nosignatures:
     :toctree: model/
 
+    cache
+    dataset
     interp
+    xcorr
 """
 import schedula as sh
 
@@ -55,31 +58,51 @@ def _get(labels, name, data, *keys):
     return [data[labels[key]] for key in keys]
 
 
-# noinspection PyPep8Naming
-def _compute_shifts(ref, *data):
+def _compute_shifts(ref, *data, search='full', max_shift=None, jobs=1,
+                    executor='thread', cache=None, names=None):
     import numpy as np
-    import numpy.fft as fft
+    from . import xcorr
+    from syncing import profiling
 
     l, h = zip(*((x.min(), x.max()) for x, y in (ref,) + data))
-    l, h = min(l), max(h)
-
-    dx = float(np.median(np.diff(ref[0])) / 10)
-
-    X = np.arange(l, h + dx, dx)
-    Y = np.interp(X, *ref)
-
-    zero_index, f1 = int(len(Y) / 2) - 1, fft.fft(Y)
-    for x, y in data:
-        f2 = fft.fft(np.flipud(np.interp(X, x, y)))
-        c = fft.fftshift(np.real(fft.ifft(f1 * f2)))
-        assert len(c) == len(Y)
-        yield float((zero_index - np.argmax(c)) * dx)
+    l, h = float(min(l)), float(max(h))
+
+    dx = float(np.median(np.diff(ref[0]))) / 10
+
+    n = int(np.ceil((h + dx - l) / dx))
+    if max_shift is not None:
+        max_shift = int(np.floor(max_shift / dx))
+    lags = xcorr.bound_lags(n, max_shift)
+    res, keys = [None] * len(data), None
+    if cache is not None:
+        ref_key = cache.key('shift', ref, l, dx, n, lags, search)
+        keys = [cache.key(ref_key, d) for d in data]
+        res = [cache.get(k) for k in keys]
+    missing = [i for i, v in enumerate(res) if v is None]
+    if missing and names and profiling.is_active():
+        # Data-sets are searched one by one to profile each of them.
+        searcher, found = xcorr.Searcher(ref, l, dx, n, lags, search), []
+        for i in missing:
+            with profiling.section('shifts', names[i]):
+                found.extend(searcher([data[i]]))
+    else:
+        found = missing and xcorr.search(
+            ref, [data[i] for i in missing], l, dx, n, lags, search, jobs,
+            executor
+        )
+    for i, lag in zip(missing, found):
+        res[i] = float(lag * dx)
+        if keys:
+            cache.set(keys[i], res[i])
+    return res
 
 
 @sh.add_function(
     dsp, inputs_kwargs=True, inputs_defaults=True, outputs=['shifts']
 )
-def calculate_shifts(labels, reference_name, data, no_sync=False):
+def calculate_shifts(labels, reference_name, data, no_sync=False,
+                     shift_search='full', max_shift=None, jobs=1,
+                     executor='thread', cache_dir=None, cache_size=1024):
     """
     Calculates the shifts from the reference data-set.
 
@@ -101,23 +124,133 @@ def calculate_shifts(labels, reference_name, data, no_sync=False):
         Skip the data synchronisation?
     :type no_sync: bool
 
+    :param shift_search:
+        Shift search strategy:
+
+            + 'full': correlation on the whole fine grid.
+            + 'pyramid': coarse-to-fine search, i.e., the shift is found on a
+              decimated anti-aliased grid and then refined at full resolution
+              only around the coarse peak (faster and lighter for long
+              signals).
+    :type shift_search: str
+
+    :param max_shift:
+        Maximum absolute shift from the reference data-set. Only the lags
+        within this bound are computed and searched.
+    :type max_shift: float
+
+    :param jobs:
+        Number of workers computing the shifts of the data-sets in parallel.
+        If 0, it is the number of CPUs.
+    :type jobs: int
+
+    :param executor:
+        Pool type of the workers ('thread' or 'process').
+    :type executor: str
+
+    :param cache_dir:
+        Directory of the result cache. If given, the shifts of the data-sets
+        whose signals (and the reference one) are unchanged are loaded from the
+        cache instead of being recomputed.
+    :type cache_dir: str
+
+    :param cache_size:
+        Maximum size of the result cache [MB].
+    :type cache_size: float
+
     :return:
         Shifts from the reference data-set.
     :rtype: dict[str, float]
     """
+    from .cache import open_cache
+    if max_shift is not None and max_shift < 0:
+        raise ValueError('Invalid max shift %r, it must be >= 0.' % max_shift)
     keys = [k for k in data if k != reference_name]
     if no_sync:
         return dict.fromkeys(keys, 0)
     data = {k: _get(labels, k, v, 'x', 'y') for k, v in data.items()}
     args = sh.selector([reference_name] + keys, data, output_type='list')
-    return sh.map_list(keys, *_compute_shifts(*args))
+    return sh.map_list(keys, *_compute_shifts(
+        *args, search=shift_search, max_shift=max_shift, jobs=jobs,
+        executor=executor, cache=open_cache(cache_dir, cache_size),
+        names=keys
+    ))
 
 
 def _interpolate(x, x_label, data, methods):
-    xp = data[x_label]
-    return {
-        k: methods[k](x, xp=xp, fp=v) for k, v in data.items() if k != x_label
-    }
+    import numpy as np
+    from .interp import VECTORISED
+    from .dataset import DataSet, columnar
+    data = columnar(data)
+    xp, keys = data[x_label], [k for k in data if k != x_label]
+    if not isinstance(data, DataSet):
+        return {k: methods[k](x, xp=xp, fp=data[k]) for k in keys}
+    groups = {}
+    values = np.empty((len(x), len(keys)), dtype=data.values.dtype, order='F')
+    for i, k in enumerate(keys):
+        groups.setdefault(methods[k], []).append(i)
+    for method, i in groups.items():
+        if len(i) > 1 and method in VECTORISED:
+            fp = data.values[:, [data.index(keys[j]) for j in i]]
+            values[:, i] = method(x, xp=xp, fp=fp)
+        else:
+            for j in i:
+                values[:, j] = method(x, xp=xp, fp=data[keys[j]])
+    return DataSet(values, keys)
+
+
+def _temporary_block(shape, dtype=float):
+    import tempfile
+    import numpy as np
+    if not all(shape):
+        return np.empty(shape, dtype=dtype, order='F')
+    with tempfile.TemporaryFile() as file:
+        return np.memmap(file, dtype=dtype, mode='w+', shape=shape, order='F')
+
+
+def _interpolate_chunks(x, shift, x_label, data, methods, chunk_size):
+    from .interp import VECTORISED, resampler
+    from .dataset import DataSet, columnar
+    data = columnar(data)
+    if not isinstance(data, DataSet):
+        return _interpolate(x + shift, x_label, data, methods)
+    xp, keys = data[x_label], [k for k in data if k != x_label]
+    groups, funcs = {}, []
+    for i, k in enumerate(keys):
+        groups.setdefault(methods[k], []).append(i)
+    for method, i in groups.items():
+        if len(i) > 1 and method in VECTORISED:
+            i = [(i, [data.index(keys[j]) for j in i])]
+        else:
+            i = [(j, data.index(keys[j])) for j in i]
+        funcs.extend((j, resampler(method, x, xp, data.values, shift, c))
+                     for j, c in i)
+    values = _temporary_block((len(x), len(keys)), data.values.dtype)
+    for start in range(0, len(x), chunk_size):
+        stop = min(start + chunk_size, len(x))
+        for i, func in funcs:
+            values[start:stop, i] = func(start, stop)
+    return DataSet(values, keys)
+
+
+def _nested(data):
+    from .dataset import DataSet
+    if isinstance(data, DataSet):
+        return data.nested()
+    res = {}
+    for (j,), v in sh.stack_nested_keys(data, depth=1):
+        j = sh.stlp(j)
+        sh.get_nested_dicts(res, *j[:-1])[j[-1]] = v
+    return res
+
+
+def _method_names(methods, x_label, data):
+    # Names of the interpolation methods used, or None if any is a custom
+    # function (it cannot be identified reliably, hence it is not cached).
+    from .interp import METHODS
+    names = {v: k for k, v in METHODS.items()}
+    res = {k: names.get(methods[k]) for k in data if k != x_label}
+    return None if None in res.values() else res
 
 
 @sh.add_function(dsp, outputs=['methods'], inputs_kwargs=True,
@@ -143,8 +276,10 @@ def define_interpolation_methods(interpolation_method='linear'):
     return collections.defaultdict(lambda: default)
 
 
-@sh.add_function(dsp, outputs=['resampled'])
-def resample_data(labels, reference_name, data, shifts, methods):
+@sh.add_function(dsp, outputs=['resampled'], inputs_kwargs=True,
+                 inputs_defaults=True)
+def resample_data(labels, reference_name, data, shifts, methods,
+                  chunk_size=None, cache_dir=None, cache_size=1024):
     """
     Resample all data-sets using the reference signal.
 
@@ -160,7 +295,7 @@ def resample_data(labels, reference_name, data, shifts, methods):
 
     :param data:
         Data-sets.
-    :type data: dict[str, dict[str, numpy.array]]
+    :type data: dict[str, syncing.model.dataset.DataSet | dict]
 
     :param shifts:
         Shifts from the reference data-set.
@@ -172,17 +307,67 @@ def resample_data(labels, reference_name, data, shifts, methods):
         It is like `{"<set-name>": {"<var-name>": "<interp>", ...}, ...}`.
     :type methods: collections.defaultdict
 
+    :param chunk_size:
+        Number of reference samples re-sampled at once. If given, each chunk
+        reads only the data window that it needs and it is written in
+        temporary files (memory-mapped), hence the re-sampling working memory
+        is bounded by the chunk size. If None, data-sets are re-sampled in
+        memory.
+
+        The whole pipeline stays out of core only with memory-mapped inputs
+        (i.e., `.npy` directories read without `sets_mapping`, `dtype`
+        conversions, and all-NaN variables, which are copied when selected)
+        and streaming writers (i.e., `.npy`, `.json`, and `.xlsx` with the
+        `stream` engine). The other readers and writers hold the data-sets in
+        memory, and the shifts are computed on whole columns.
+    :type chunk_size: int
+
+    :param cache_dir:
+        Directory of the result cache. If given, the data-sets whose data,
+        shift, and interpolation methods (and the reference x-axis) are
+        unchanged are loaded from the cache instead of being re-sampled. The
+        data-sets re-sampled with custom functions are not cached.
+    :type cache_dir: str
+
+    :param cache_size:
+        Maximum size of the result cache [MB].
+    :type cache_size: float
+
     :return:
         Resampled data-sets.
-    :rtype: dict[str, dict[str, numpy.array]]
+    :rtype: dict[str, syncing.model.dataset.DataSet | dict]
     """
+    from .cache import open_cache
+    from syncing.profiling import section
     x = data[reference_name][labels[reference_name]['x']]
-    r, res = {reference_name: data[reference_name]}, {}
+    res = {reference_name: _nested(data[reference_name])}
+    cache = open_cache(cache_dir, cache_size)
+    if cache is not None:
+        ref_key = cache.key('resampled', x)
     for k, s in shifts.items():
-        r[k] = _interpolate(x + s, labels[k]['x'], data[k], methods[k])
+        with section('resample', k):
+            res[k] = _resample(
+                x, s, labels[k]['x'], data[k], methods[k], chunk_size,
+                cache, cache is not None and ref_key
+            )
+    return res
 
-    for (i, j), v in sh.stack_nested_keys(r):
-        j = sh.stlp(j)
-        sh.get_nested_dicts(res, i, *j[:-1])[j[-1]] = v
 
+def _resample(x, shift, x_label, data, methods, chunk_size, cache, ref_key):
+    if cache is not None:
+        names = _method_names(methods, x_label, data)
+        if names is None:
+            cache = None
+    if cache is not None:
+        key = cache.key(ref_key, shift, x_label, data, names)
+        res = cache.get(key)
+        if res is not None:
+            return res
+    if chunk_size:
+        res = _interpolate_chunks(x, shift, x_label, data, methods, chunk_size)
+    else:
+        res = _interpolate(x + shift, x_label, data, methods)
+    res = _nested(res)
+    if cache is not None:
+        cache.set(key, res)
     return res
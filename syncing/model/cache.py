@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+It contains an on-disk cache of the model results (i.e., shifts and re-sampled
+data-sets).
+
+The results are content-addressed: each file is named after a hash of the data
+and of the parameters that produce it, hence a data-set is recomputed only when
+its inputs change. The least recently used files are evicted when the cache
+exceeds its maximum size.
+"""
+import os
+import pickle
+import hashlib
+import os.path as osp
+import numpy as np
+
+
+def _update(h, obj):
+    from .dataset import DataSet
+    if isinstance(obj, DataSet):
+        _update(h, ('DataSet', obj.columns, obj.values))
+    elif isinstance(obj, dict):
+        h.update(b'{%d' % len(obj))
+        for k, v in sorted(obj.items(), key=lambda x: repr(x[0])):
+            _update(h, k)
+            _update(h, v)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'(%d' % len(obj))
+        for v in obj:
+            _update(h, v)
+    elif isinstance(obj, np.ndarray) or hasattr(obj, '__array__'):
+        a = np.asarray(obj)
+        if a.dtype.hasobject:
+            _update(h, a.tolist())
+            return
+        order = 'F' if a.flags.f_contiguous and not a.flags.c_contiguous \
+            else 'C'
+        h.update(('<%s%s%s>' % (a.dtype.str, order, a.shape)).encode())
+        a = a.T if order == 'F' else np.ascontiguousarray(a)  # No copy.
+        h.update(a.reshape(-1).view(np.uint8))
+    else:
+        h.update(('%s:%r;' % (type(obj).__name__, obj)).encode())
+
+
+class ResultCache:
+    """
+    On-disk cache of the model results with LRU eviction.
+
+    :param path:
+        Cache directory.
+    :type path: str
+
+    :param max_size:
+        Maximum size of the cache [MB].
+    :type max_size: float
+
+    Example::
+
+        >>> import tempfile
+        >>> cache = ResultCache(tempfile.mkdtemp())
+        >>> key = cache.key('shift', np.arange(3.), 'full')
+        >>> cache.get(key) is None
+        True
+        >>> cache.set(key, 4.0)
+        >>> cache.get(key)
+        4.0
+    """
+
+    def __init__(self, path, max_size=1024):
+        self.path, self.max_size = path, max_size * 2 ** 20
+        os.makedirs(path, exist_ok=True)
+        self.size = sum(osp.getsize(f) for f, _ in self._files())
+
+    @staticmethod
+    def key(*args):
+        """
+        Returns the key of the given data and parameters.
+
+        :return:
+            Hexadecimal hash of the arguments.
+        :rtype: str
+        """
+        h = hashlib.blake2b(digest_size=20)
+        _update(h, args)
+        return h.hexdigest()
+
+    def _fpath(self, key):
+        return osp.join(self.path, key[:2], '%s.pkl' % key)
+
+    def _files(self):
+        for root, _, files in os.walk(self.path):
+            for f in files:
+                if f.endswith('.pkl'):
+                    f = osp.join(root, f)
+                    try:
+                        yield f, os.stat(f).st_mtime
+                    except FileNotFoundError:  # Evicted by another process.
+                        pass
+
+    def get(self, key, default=None):
+        """
+        Returns the cached result, marking it as recently used.
+
+        Unreadable results (e.g., truncated files) are removed and treated as
+        not cached.
+
+        :param key:
+            Result key.
+        :type key: str
+
+        :param default:
+            Value returned if the result is not cached.
+        :type default: object
+
+        :return:
+            Cached result.
+        :rtype: object
+        """
+        fpath = self._fpath(key)
+        try:
+            with open(fpath, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(fpath)
+        except OSError:
+            return default
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError,
+                IndexError, ValueError, TypeError):
+            self._remove(fpath)
+            return default
+        return value
+
+    def _remove(self, fpath):
+        try:
+            size = osp.getsize(fpath)
+            os.remove(fpath)
+            self.size -= size
+        except OSError:  # Removed by another process.
+            pass
+
+    def set(self, key, value):
+        """
+        Stores a result, evicting the least recently used ones if the cache
+        exceeds its maximum size.
+
+        :param key:
+            Result key.
+        :type key: str
+
+        :param value:
+            Result.
+        :type value: object
+        """
+        fpath = self._fpath(key)
+        os.makedirs(osp.dirname(fpath), exist_ok=True)
+        temp = '%s.%d.tmp' % (fpath, os.getpid())
+        with open(temp, 'wb') as f:
+            pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, fpath)  # Atomic, readers never see partial files.
+        self.size += osp.getsize(fpath)
+        if self.size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used results until the cache size is within
+        its maximum.
+        """
+        files = sorted(self._files(), key=lambda x: x[1])
+        self.size = sum(osp.getsize(f) for f, _ in files)
+        for fpath, _ in files:
+            if self.size <= self.max_size:
+                break
+            self._remove(fpath)
+
+
+def open_cache(cache_dir=None, cache_size=1024):
+    """
+    Opens the result cache.
+
+    :param cache_dir:
+        Cache directory. If None, the cache is disabled.
+    :type cache_dir: str
+
+    :param cache_size:
+        Maximum size of the cache [MB].
+    :type cache_size: float
+
+    :return:
+        Result cache or None, if disabled.
+    :rtype: ResultCache
+    """
+    return None if cache_dir is None else ResultCache(cache_dir, cache_size)
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+It contains the columnar data-set container.
+"""
+import collections.abc as abc
+import numpy as np
+
+#: Float types of the data-sets blocks.
+DTYPES = ('float64', 'float32')
+
+
+def float_dtype(dtype):
+    """
+    Returns the float type that stores values of the given type, i.e., single
+    precision is kept and any other type is stored in double precision.
+
+    :param dtype:
+        Type of the values.
+    :type dtype: numpy.dtype | str
+
+    :return:
+        Float type.
+    :rtype: numpy.dtype
+    """
+    return np.dtype(np.float32 if np.dtype(dtype) == np.float32 else float)
+
+
+class DataSet(dict):
+    """
+    Data-set stored as one contiguous 2-D float block plus a column index.
+
+    It behaves like a `dict` of 1-D arrays (i.e., `{"<var-name>": array}`),
+    whose values are views of the block columns. The block is Fortran ordered,
+    hence each column is contiguous in memory.
+
+    :param values:
+        2-D block of data, one column for each variable.
+    :type values: numpy.array
+
+    :param columns:
+        Variables names, one for each column of the block.
+    :type columns: list
+
+    :param dtype:
+        Float type of the block ('float64' or 'float32'). If None, it is
+        :func:`float_dtype` of the values type.
+    :type dtype: str
+
+    Example::
+
+        >>> import numpy as np
+        >>> ds = DataSet(np.arange(6).reshape(3, 2), ['x', 'y'])
+        >>> ds['y']
+        array([1., 3., 5.])
+        >>> ds.values.shape
+        (3, 2)
+        >>> DataSet(ds.values, ds.columns, 'float32')['y']
+        array([1., 3., 5.], dtype=float32)
+    """
+
+    def __init__(self, values, columns, dtype=None):
+        if not hasattr(values, 'dtype'):
+            values = np.asarray(values)
+        dtype = float_dtype(values.dtype if dtype is None else dtype)
+        values = np.asarray(values, dtype=dtype, order='F')
+        columns = list(columns)
+        if values.ndim != 2 or values.shape[1] != len(columns):
+            raise ValueError('Block shape %r does not match %d columns.' % (
+                values.shape, len(columns)
+            ))
+        super(DataSet, self).__init__(zip(columns, values.T))
+        self.values, self.columns = values, columns
+
+    @classmethod
+    def from_dict(cls, data, dtype=None):
+        """
+        Builds a data-set from a dict of 1-D arrays of the same length.
+
+        :param data:
+            Data-set like `{"<var-name>": array}`.
+        :type data: dict[str, numpy.array]
+
+        :param dtype:
+            Float type of the block ('float64' or 'float32'). If None, it is
+            'float32' when all arrays are in single precision, otherwise
+            'float64'.
+        :type dtype: str
+
+        :return:
+            Data-set.
+        :rtype: DataSet
+        """
+        if isinstance(data, cls):
+            return data
+        if len({np.shape(v) for v in data.values()}) > 1:
+            raise ValueError('Columns must have the same length.')
+        if dtype is None:
+            dtype = float
+            if data and all(getattr(v, 'dtype', None) == np.float32
+                            for v in data.values()):
+                dtype = np.float32
+        values = np.empty((len(next(iter(data.values()), ())), len(data)),
+                          dtype=float_dtype(dtype), order='F')
+        for i, v in enumerate(data.values()):
+            values[:, i] = v
+        return cls(values, data)
+
+    def __reduce__(self):
+        return self.__class__, (self.values, self.columns)
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, dict.__repr__(self))
+
+    def index(self, key):
+        """
+        Returns the column index of a variable.
+
+        :param key:
+            Variable name.
+        :type key: str
+
+        :return:
+            Column index.
+        :rtype: int
+        """
+        return self.columns.index(key)
+
+    def select(self, keys, names=None):
+        """
+        Selects (and renames) the given variables.
+
+        :param keys:
+            Variables to select.
+        :type keys: list
+
+        :param names:
+            New variables names. If None, `keys` are used.
+        :type names: list
+
+        :return:
+            Data-set with the selected variables.
+        :rtype: DataSet
+        """
+        keys = list(keys)
+        values = self.values[:, [self.index(k) for k in keys]]
+        return self.__class__(values, keys if names is None else names)
+
+    def dropna(self):
+        """
+        Removes the variables whose values are all NaN.
+
+        :return:
+            Data-set without empty variables.
+        :rtype: DataSet
+        """
+        # Column by column, to not copy memory-mapped values in memory.
+        b = [bool(np.isnan(v).all()) for v in self.values.T]
+        if not any(b):
+            return self
+        return self.select([k for k, v in zip(self.columns, b) if not v])
+
+    def _rebuild(self, values, columns):
+        dict.clear(self)
+        self.__init__(values, columns)
+
+    def __setitem__(self, key, value):
+        value = np.asarray(value, dtype=self.values.dtype)
+        if value.shape != (len(self.values),):
+            raise ValueError('Column %r has not length %d.' % (
+                key, len(self.values)
+            ))
+        if key in self:
+            self.values[:, self.index(key)] = value
+        else:
+            self._rebuild(
+                np.column_stack((self.values, value)), self.columns + [key]
+            )
+
+    def __delitem__(self, key):
+        i = self.index(key)
+        self._rebuild(
+            np.delete(self.values, i, 1),
+            self.columns[:i] + self.columns[i + 1:]
+        )
+
+    update = abc.MutableMapping.update
+    pop = abc.MutableMapping.pop
+    popitem = abc.MutableMapping.popitem
+    setdefault = abc.MutableMapping.setdefault
+
+    def clear(self):
+        self._rebuild(
+            np.empty((len(self.values), 0), dtype=self.values.dtype), []
+        )
+
+    def copy(self):
+        return self.__class__(self.values.copy(order='F'), self.columns)
+
+    def nested(self):
+        """
+        Returns the data-set as nested dictionaries of column views, splitting
+        the tuple keys (e.g., from multi-row headers) into nesting levels.
+
+        :return:
+            Data-set as nested dictionaries, or itself if keys are not tuples.
+        :rtype: dict | DataSet
+        """
+        if not any(isinstance(k, tuple) for k in self.columns):
+            return self
+        import schedula as sh
+        res = {}
+        for k, v in self.items():
+            k = sh.stlp(k)
+            sh.get_nested_dicts(res, *k[:-1])[k[-1]] = v
+        return res
+
+
+def columnar(data, dtype=None):
+    """
+    Converts a data-set into a :class:`DataSet`, if all its variables are
+    numeric 1-D arrays of the same length.
+
+    :param data:
+        Data-set like `{"<var-name>": array}`.
+    :type data: dict[str, numpy.array]
+
+    :param dtype:
+        Float type of the block (see :meth:`DataSet.from_dict`).
+    :type dtype: str
+
+    :return:
+        Columnar data-set or the data-set itself if it cannot be converted.
+    :rtype: DataSet | dict
+    """
+    if isinstance(data, DataSet) or not data:
+        return data
+    try:
+        if all(np.ndim(v) == 1 for v in data.values()):
+            return DataSet.from_dict(data, dtype)
+    except (ValueError, TypeError):
+        pass
+    return data
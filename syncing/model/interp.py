@@ -10,15 +10,64 @@ It contains utility functions and methods to interpolate the data-sets.
 """
 import functools
 import numpy as np
-import scipy.interpolate as sci_itp
 
 
 def _interp_wrapper(func, x, xp, fp, **kw):
+    import scipy.interpolate as sci_itp  # Lazy import, it is slow to load.
+    func = getattr(sci_itp, func)
     if isinstance(kw.get('fill_value'), tuple) and not kw['fill_value']:
         kw['fill_value'] = fp[0], fp[-1]
     return np.nan_to_num(func(xp, fp, **kw)(x))
 
 
+def linear_interpolation(x, xp, fp):
+    """
+    Re-samples data using the linear interpolation.
+
+    Outside the data range, the first and last data values are used.
+
+    :param x:
+        The x-coordinates of the re-sampled values.
+    :type x: numpy.array
+
+    :param xp:
+        The x-coordinates of the data points.
+    :type xp: numpy.array
+
+    :param fp:
+        The y-coordinates of the data points, same length as xp. If 2-D, each
+        column is a signal.
+    :type fp: numpy.array
+
+    :return:
+        Re-sampled y-values (single precision if `fp` is).
+    :rtype: numpy.array
+    """
+    from .dataset import float_dtype
+    xp, fp = np.asarray(xp, dtype=float), np.asarray(fp)
+    fp = fp.astype(float_dtype(fp.dtype), copy=False)
+    if np.any(xp[1:] < xp[:-1]):
+        i = np.argsort(xp, kind='mergesort')
+        xp, fp = xp[i], fp[i]
+    if fp.ndim == 1:
+        return np.nan_to_num(np.interp(x, xp, fp).astype(fp.dtype, copy=False))
+    if len(xp) == 1:
+        return np.nan_to_num(np.repeat(fp, len(x), axis=0))
+    # Bracketing indices and weights are computed once for all the columns.
+    x = np.asarray(x, dtype=float)
+    i = np.searchsorted(xp, x, 'right').clip(1, len(xp) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = (x - xp[i - 1]) / (xp[i] - xp[i - 1])
+    w = np.where(x >= xp[i], 1.0, w).clip(0, 1)  # Outside, the edge values.
+    w = w.astype(fp.dtype, copy=False)
+    fp = fp.T  # The rows of a column-major block are gathered faster.
+    y, v = fp.take(i - 1, axis=1), fp.take(i, axis=1)
+    y *= 1 - w
+    v *= w
+    y += v
+    return np.nan_to_num(y.T, copy=False)
+
+
 def polynomial_interpolation(x, xp, fp, order=1):
     """
     Re-samples data using the polynomial interpolation.
@@ -32,7 +81,8 @@ def polynomial_interpolation(x, xp, fp, order=1):
     :type xp: numpy.array
 
     :param fp:
-        The y-coordinates of the data points, same length as xp.
+        The y-coordinates of the data points, same length as xp. If 2-D, each
+        column is a signal.
     :type fp: numpy.array
 
     :param order:
@@ -43,15 +93,47 @@ def polynomial_interpolation(x, xp, fp, order=1):
         Re-sampled y-values.
     :rtype: numpy.array
     """
-    return np.poly1d(np.polyfit(xp, fp, order))(x)
+    return _polyval(np.polyfit(xp, fp, order), x)
+
+
+def _polyval(c, x):
+    if c.ndim == 1:
+        return np.poly1d(c)(x)
+    x, y = np.asarray(x)[:, None], np.zeros((len(x), c.shape[1]))
+    for v in c:
+        y = y * x + v
+    return y
+
+
+def _cumulative_trapezoid(y, x, axis=-1):
+    try:
+        from scipy.integrate import cumulative_trapezoid
+    except ImportError:  # SciPy < 1.6.
+        from scipy.integrate import cumtrapz as cumulative_trapezoid
+    return cumulative_trapezoid(y, x, axis=axis, initial=0)
 
 
 # noinspection PyPep8Naming
 def _cum_integral(x, xp, fp):
-    from scipy.integrate import cumtrapz
     X = np.unique(np.concatenate((x, xp)))
-    Y = np.interp(X, xp, fp, left=0.0, right=0.0)
-    return cumtrapz(Y, X, initial=0)[np.searchsorted(X, x)]
+    if fp.ndim == 1:
+        Y = np.interp(X, xp, fp, left=0.0, right=0.0)
+    else:
+        Y = np.column_stack([
+            np.interp(X, xp, v, left=0.0, right=0.0) for v in fp.T
+        ])
+    return _cumulative_trapezoid(Y, X, axis=0)[np.searchsorted(X, x)]
+
+
+def _integral_banded_matrix(x):
+    n = len(x)
+    dx = np.zeros(n + 1)
+    dx[1:-1] = np.diff(x)
+    dx /= 8.0
+    # Upper form of the symmetric tridiagonal matrix (see `solveh_banded`).
+    ab = np.zeros((2, n))
+    ab[0, 1:], ab[1] = dx[1:-1], (dx[:-1] + dx[1:]) * 3.0
+    return ab
 
 
 # noinspection PyPep8Naming
@@ -59,6 +141,11 @@ def integral_interpolation(x, xp, fp):
     """
     Re-samples data maintaining the signal integral.
 
+    The integral of the re-sampled signal is preserved by solving a symmetric
+    tridiagonal system, hence memory and time are linear in the number of
+    re-sampled values. When the system is not positive definite (e.g., `x` is
+    not sorted), it is solved with a general banded solver.
+
     :param x:
         The x-coordinates of the re-sampled values.
     :type x: numpy.array
@@ -68,42 +155,52 @@ def integral_interpolation(x, xp, fp):
     :type xp: numpy.array
 
     :param fp:
-        The y-coordinates of the data points, same length as xp.
+        The y-coordinates of the data points, same length as xp. If 2-D, each
+        column is a signal and all are solved with the same factorisation.
     :type fp: numpy.array
 
     :return:
         Re-sampled y-values.
     :rtype: numpy.array
     """
-
+    from scipy.linalg import solveh_banded, solve_banded, LinAlgError
     x, fp = np.asarray(x, dtype=float), np.asarray(fp, dtype=float)
     xp = np.asarray(xp, dtype=float)
-    n = len(x)
-    X, dx = np.zeros(n + 1), np.zeros(n + 1)
-    dx[1:-1] = np.diff(x)
-    X[0], X[1:-1], X[-1] = x[0], x[:-1] + dx[1:-1] / 2, x[-1]
-    integral_matrix = np.diff(_cum_integral(X, xp, fp))
-
-    dx /= 8.0
-    # noinspection PyTypeChecker
-    A = np.diag((dx[:-1] + dx[1:]) * 3.0)
-    i, j = np.indices(A.shape)
-    A[i == j - 1] = A[i - 1 == j] = dx[1:-1]
-
-    return np.linalg.solve(A, integral_matrix)
+    X = np.empty(len(x) + 1)
+    X[0], X[1:-1], X[-1] = x[0], (x[:-1] + x[1:]) / 2, x[-1]
+    integral_matrix = np.diff(_cum_integral(X, xp, fp), axis=0)
+    try:
+        return solveh_banded(
+            _integral_banded_matrix(x), integral_matrix, overwrite_ab=True,
+            check_finite=False
+        )
+    except LinAlgError:  # Not positive definite (e.g., x is not sorted).
+        ab = _integral_banded_matrix(x)
+        ab = np.vstack((ab, np.roll(ab[:1], -1, axis=1)))
+        try:
+            return solve_banded(
+                (1, 1), ab, integral_matrix, overwrite_ab=True,
+                overwrite_b=True, check_finite=False
+            )
+        except LinAlgError:
+            raise ValueError(
+                'Integral interpolation is undetermined, x-coordinates cannot '
+                'be repeated at the ends or more than twice.'
+            )
 
 
 METHODS = ('linear', 'nearest', 'zero', 'slinear', 'quadratic', 'cubic')
-_kw = dict(fill_value=(), copy=False, bounds_error=False)
+_kw = dict(fill_value=(), copy=False, bounds_error=False, axis=0)
 METHODS = {
-    k: functools.partial(_interp_wrapper, sci_itp.interp1d, kind=k, **_kw)
+    k: functools.partial(_interp_wrapper, 'interp1d', kind=k, **_kw)
     for k in METHODS
 }
+METHODS['linear'] = linear_interpolation
 METHODS['pchip'] = functools.partial(
-    _interp_wrapper, sci_itp.PchipInterpolator
+    _interp_wrapper, 'PchipInterpolator'
 )
 METHODS['akima'] = functools.partial(
-    _interp_wrapper, sci_itp.Akima1DInterpolator
+    _interp_wrapper, 'Akima1DInterpolator'
 )
 METHODS['integral'] = integral_interpolation
 for k in range(5):
@@ -113,5 +210,93 @@ for k in range(5):
 
 for k in range(5, 10, 2):
     METHODS['spline%d' % k] = functools.partial(
-        _interp_wrapper, sci_itp.interp1d, kind=k, **_kw
+        _interp_wrapper, 'interp1d', kind=k, **_kw
     )
+
+#: Interpolation methods that accept a 2-D `fp` (i.e., one signal per column).
+VECTORISED = frozenset(METHODS.values())
+
+#: Number of data points needed on each side of a chunk of re-sampled values to
+#: get the same results of the whole signal (global methods are not listed).
+SUPPORT = {METHODS[k]: 2 for k in ('linear', 'nearest', 'zero', 'slinear')}
+SUPPORT.update({METHODS['pchip']: 4, METHODS['akima']: 4})
+SUPPORT.update({METHODS['quadratic']: 64, METHODS['cubic']: 64})
+SUPPORT.update({METHODS['spline%d' % k]: 128 for k in range(5, 10, 2)})
+SUPPORT[METHODS['integral']] = 2
+
+#: Number of re-sampled values added on each side of a chunk to get the same
+#: results of the whole signal with the `integral` method.
+INTEGRAL_OVERLAP = 64
+
+
+def resampler(method, x, xp, fp, shift=0.0, columns=None):
+    """
+    Returns a function that re-samples the chunk `x[start:stop] + shift`
+    reading only the data window that it needs.
+
+    The chunk results are the same of `method(x + shift, xp, fp)` (within
+    floating point tolerance). Global methods (e.g., polynomials) are fitted
+    once on the whole data.
+
+    :param method:
+        Interpolation method.
+    :type method: callable
+
+    :param x:
+        The x-coordinates of the re-sampled values.
+    :type x: numpy.array
+
+    :param xp:
+        The x-coordinates of the data points. If not sorted, `xp` and `fp` are
+        sorted once (i.e., copied).
+    :type xp: numpy.array
+
+    :param fp:
+        The y-coordinates of the data points, same length as xp.
+    :type fp: numpy.array
+
+    :param shift:
+        Shift to add to `x`.
+    :type shift: float
+
+    :param columns:
+        Columns of `fp` to re-sample. If None, all `fp` is used.
+    :type columns: int | list[int]
+
+    :return:
+        Function that returns the re-sampled values for the given chunk.
+    :rtype: callable
+    """
+    xp = np.asarray(xp)
+    if np.any(xp[1:] < xp[:-1]):  # The windows are searched in sorted data.
+        i = np.argsort(xp, kind='mergesort')
+        xp, fp = xp[i], (fp if columns is None else fp[:, columns])[i]
+        columns = None
+
+    def _fp(i=None, j=None):
+        return fp[i:j] if columns is None else fp[i:j, columns]
+
+    if getattr(method, 'func', None) is polynomial_interpolation:
+        c = np.polyfit(xp, _fp(), method.keywords['order'])
+        return lambda start, stop: _polyval(c, x[start:stop] + shift)
+
+    support = SUPPORT.get(method)
+    if support is None:
+        return lambda start, stop: method(
+            x[start:stop] + shift, xp=xp, fp=_fp()
+        )
+
+    def _window(start, stop):
+        v = x[start:stop] + shift
+        i = max(int(np.searchsorted(xp, v.min())) - support, 0)
+        j = int(np.searchsorted(xp, v.max(), 'right')) + support
+        return method(v, xp=xp[i:j], fp=_fp(i, j))
+
+    if method is not METHODS['integral']:
+        return _window
+
+    def _integral(start, stop):
+        i = max(start - INTEGRAL_OVERLAP, 0)
+        return _window(i, stop + INTEGRAL_OVERLAP)[start - i:stop - i]
+
+    return _integral
@@ -0,0 +1,573 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+It contains the cross-correlation engine used to compute the data-sets shifts.
+
+The signals are correlated on a uniform grid `start + i * step` (with
+`i = 0, ..., n - 1`) and they are provided as `samplers`, i.e., functions that
+return the signal values for the given grid indices. Hence, the grid can be
+processed in blocks without allocating it entirely.
+
+The correlation runs in the precision of the signals values: single precision
+signals are sampled, transformed, and correlated in `float32` (i.e., half of
+the memory and bandwidth of `float64`), while the grid positions and the
+interpolation are always computed in double precision.
+"""
+import numpy as np
+from .dataset import float_dtype
+
+#: Maximum number of multiply-accumulate operations of the direct correlation.
+DIRECT_MAX_OPS = 2 ** 18
+
+#: Default number of grid points processed at once by the blocked correlation.
+BLOCK_SIZE = 2 ** 16
+
+#: Maximum number of points of the coarsest grid of the pyramid search.
+PYRAMID_SIZE = 2 ** 16
+
+
+def fast_len(n):
+    """
+    Returns the smallest fast FFT length of real signals greater than `n`.
+
+    :param n:
+        Minimum length.
+    :type n: int
+
+    :return:
+        Fast FFT length.
+    :rtype: int
+    """
+    from scipy.fft import next_fast_len
+    return next_fast_len(n, True)
+
+
+def full_lags(n):
+    """
+    Returns all lags of a circular correlation of length `n`.
+
+    :param n:
+        Length of the correlated signals.
+    :type n: int
+
+    :return:
+        Minimum and maximum lags.
+    :rtype: int, int
+    """
+    return n // 2 - n, n // 2 - 1
+
+
+def _valid_correlation(a, width):
+    n = len(a)
+    if n * width <= DIRECT_MAX_OPS:
+        return lambda z: np.correlate(z, a, 'valid')
+    from scipy.fft import rfft, irfft
+    size = fast_len(n + width - 1)
+    spectrum = np.conj(rfft(a, size))
+    return lambda z: irfft(rfft(z, size) * spectrum, size)[:width]
+
+
+class Correlator:
+    """
+    Circular cross-correlation engine with a fixed reference signal.
+
+    The correlation of the reference `a` with a signal `z` (of the same length
+    `n`) at lag `L` is `r[L] = sum_j a[j] * z[(j + L) % n]`. It is computed
+    directly for small problems, otherwise with real FFTs padded to a fast
+    length (or with circular real FFTs when `n` is already a fast length and
+    all lags are requested). The reference spectrum is computed once and reused
+    for every correlated signal.
+
+    :param a:
+        Reference signal.
+    :type a: numpy.array
+
+    :param lags:
+        Minimum and maximum lags to compute.
+    :type lags: int, int
+    """
+
+    def __init__(self, a, lags=None):
+        a = np.asarray(a)
+        self.a = a = a.astype(float_dtype(a.dtype), copy=False)
+        n = len(a)
+        self.lags = lo, hi = lags or full_lags(n)
+        self.width = w = hi - lo + 1
+        self.direct = n * w <= DIRECT_MAX_OPS
+        self.circular = not self.direct and w == n and fast_len(n) == n
+        if self.circular:
+            from scipy.fft import rfft, irfft
+            spectrum, self.index = np.conj(rfft(a)), np.arange(lo, hi + 1) % n
+
+            def _correlate(z):
+                return irfft(rfft(z) * spectrum, n)[self.index]
+
+            self._correlate = _correlate
+        else:
+            self.index = np.arange(lo, hi + n) % n
+            valid = _valid_correlation(a, w)
+            self._correlate = lambda z: valid(z[self.index])
+
+    def __call__(self, z):
+        """
+        Computes the correlation of the reference with the given signal.
+
+        :param z:
+            Signal to correlate, same length of the reference.
+        :type z: numpy.array
+
+        :return:
+            Correlation values for each lag (from the minimum to the maximum).
+        :rtype: numpy.array
+        """
+        return self._correlate(np.asarray(z, dtype=self.a.dtype))
+
+    def lag(self, z):
+        """
+        Returns the lag of maximum correlation with the given signal.
+
+        Ties are resolved in favour of the greatest lag.
+
+        :param z:
+            Signal to correlate, same length of the reference.
+        :type z: numpy.array
+
+        :return:
+            Lag of maximum correlation.
+        :rtype: int
+        """
+        return argmax_lag(self(z), self.lags)
+
+
+def argmax_lag(c, lags):
+    """
+    Returns the lag of maximum correlation.
+
+    Ties are resolved in favour of the greatest lag.
+
+    :param c:
+        Correlation values for each lag (from the minimum to the maximum).
+    :type c: numpy.array
+
+    :param lags:
+        Minimum and maximum lags.
+    :type lags: int, int
+
+    :return:
+        Lag of maximum correlation.
+    :rtype: int
+    """
+    return lags[1] - int(np.argmax(c[::-1]))
+
+
+def sampler(x, y, start, step, average=False):
+    """
+    Returns a function that samples the linear interpolation of a signal on the
+    grid `start + i * step`.
+
+    :param x:
+        The x-coordinates of the signal.
+    :type x: numpy.array
+
+    :param y:
+        The y-coordinates of the signal.
+    :type y: numpy.array
+
+    :param start:
+        Grid start.
+    :type start: float
+
+    :param step:
+        Grid step.
+    :type step: float
+
+    :param average:
+        Return the signal average over the grid cells `[-step/2, step/2]`
+        instead of the point values (i.e., an anti-aliasing box filter).
+    :type average: bool
+
+    :return:
+        Function that returns the signal values (with the float type of `y`,
+        see :func:`syncing.model.dataset.float_dtype`) for the given grid
+        indices.
+    :rtype: callable
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y)
+    dtype = float_dtype(y.dtype)
+    y = y.astype(dtype, copy=False)
+    if not average:
+        return lambda i: np.interp(start + i * step, x, y).astype(
+            dtype, copy=False
+        )
+    c = np.zeros_like(y, dtype=float)
+    np.cumsum(np.diff(x) * (y[1:] + y[:-1]) / 2, out=c[1:])
+
+    def integral(t):
+        k = np.clip(np.searchsorted(x, t, 'right') - 1, 0, len(x) - 1)
+        return c[k] + (t - x[k]) * (y[k] + np.interp(t, x, y)) / 2
+
+    t = start + step / 2
+
+    def _average(i):
+        i = i * step
+        return ((integral(t + i) - integral(t - step + i)) / step).astype(
+            dtype, copy=False
+        )
+
+    return _average
+
+
+def correlate(ref, signals, n, lags=None, block=None):
+    """
+    Computes the circular cross-correlations of the signals with the reference
+    on a grid of `n` points.
+
+    :param ref:
+        Sampler of the reference signal.
+    :type ref: callable
+
+    :param signals:
+        Samplers of the signals to correlate.
+    :type signals: list[callable]
+
+    :param n:
+        Number of grid points.
+    :type n: int
+
+    :param lags:
+        Minimum and maximum lags to compute.
+    :type lags: int, int
+
+    :param block:
+        Number of grid points processed at once. If None, the whole grid is
+        processed at once.
+    :type block: int
+
+    :return:
+        Correlation values for each lag (from the minimum to the maximum).
+    :rtype: list[numpy.array]
+    """
+    lo, hi = lags = lags or full_lags(n)
+    if block is None or block >= n:
+        i = np.arange(n)
+        correlator = Correlator(ref(i), lags)
+        return [correlator(s(i)) for s in signals]
+    res = [0] * len(signals)
+    for j in range(0, n, block):
+        i = np.arange(j, min(j + block, n))
+        valid = _valid_correlation(ref(i), hi - lo + 1)
+        i = np.arange(j + lo, i[-1] + hi + 1) % n
+        res = [r + valid(s(i)) for r, s in zip(res, signals)]
+    return res
+
+
+def search_lags(ref, data, start, step, n, lags=None, block=BLOCK_SIZE):
+    """
+    Searches the lags of maximum correlation on the full resolution grid.
+
+    When the lags are bounded, the grid is correlated in blocks, so the cost
+    scales with the number of lags instead of the grid length.
+
+    :param ref:
+        Reference signal (x, y).
+    :type ref: tuple[numpy.array]
+
+    :param data:
+        Signals (x, y) to correlate.
+    :type data: list[tuple[numpy.array]]
+
+    :param start:
+        Grid start.
+    :type start: float
+
+    :param step:
+        Grid step.
+    :type step: float
+
+    :param n:
+        Number of grid points.
+    :type n: int
+
+    :param lags:
+        Minimum and maximum lags to search.
+    :type lags: int, int
+
+    :param block:
+        Minimum number of grid points processed at once when the lags are
+        bounded.
+    :type block: int
+
+    :return:
+        Lags of maximum correlation.
+    :rtype: list[int]
+    """
+    if lags is None:
+        lags = full_lags(n)
+        block = None
+    else:
+        block = max(block, 4 * (lags[1] - lags[0] + 1))
+    res = correlate(
+        sampler(*ref, start, step), [sampler(*d, start, step) for d in data],
+        n, lags, block
+    )
+    return [argmax_lag(c, lags) for c in res]
+
+
+def bound_lags(n, max_lag=None):
+    """
+    Returns the lags of a circular correlation of length `n` bounded by
+    `max_lag`.
+
+    :param n:
+        Length of the correlated signals.
+    :type n: int
+
+    :param max_lag:
+        Maximum absolute lag.
+    :type max_lag: int
+
+    :return:
+        Minimum and maximum lags.
+    :rtype: int, int
+    """
+    lo, hi = full_lags(n)
+    if max_lag is None:
+        return lo, hi
+    return max(lo, -max_lag), min(hi, max_lag)
+
+
+def pyramid_lags(ref, data, start, step, n, lags=None, size=PYRAMID_SIZE,
+                 block=BLOCK_SIZE):
+    """
+    Searches the lags of maximum correlation with a coarse-to-fine strategy.
+
+    The lags are first found on a decimated grid (of at most `size` points)
+    using anti-aliased signals, then they are refined at full resolution only
+    within a window of two coarse cells around the coarse peak.
+
+    :param ref:
+        Reference signal (x, y).
+    :type ref: tuple[numpy.array]
+
+    :param data:
+        Signals (x, y) to correlate.
+    :type data: list[tuple[numpy.array]]
+
+    :param start:
+        Grid start.
+    :type start: float
+
+    :param step:
+        Grid step.
+    :type step: float
+
+    :param n:
+        Number of grid points.
+    :type n: int
+
+    :param lags:
+        Minimum and maximum lags to search.
+    :type lags: int, int
+
+    :param size:
+        Maximum number of points of the coarse grid.
+    :type size: int
+
+    :param block:
+        Number of grid points processed at once during the refinement.
+    :type block: int
+
+    :return:
+        Lags of maximum correlation.
+    :rtype: list[int]
+    """
+    lags, q = lags or full_lags(n), -(-n // size)
+    if q == 1:
+        return search_lags(ref, data, start, step, n, lags, block)
+    m, s = -(-n // q), start + (q - 1) * step / 2
+    lo, hi = full_lags(m)
+    window = max(lags[0] // q - 1, lo), min(-(-lags[1] // q) + 1, hi)
+    coarse = correlate(
+        sampler(*ref, s, step * q, True),
+        [sampler(*d, s, step * q, True) for d in data], m, window
+    )
+    fine, res = sampler(*ref, start, step), []
+    for d, c in zip(data, coarse):
+        lag = argmax_lag(c, window) * q
+        lag = max(lag - 2 * q, lags[0]), min(lag + 2 * q, lags[1])
+        c = correlate(fine, [sampler(*d, start, step)], n, lag, block)[0]
+        res.append(argmax_lag(c, lag))
+    return res
+
+
+class Searcher:
+    """
+    Searches the lags of maximum correlation of signals with a fixed reference.
+
+    With the 'full' strategy on all lags, the reference spectrum is computed
+    once and reused for every searched signal.
+
+    :param ref:
+        Reference signal (x, y).
+    :type ref: tuple[numpy.array]
+
+    :param start:
+        Grid start.
+    :type start: float
+
+    :param step:
+        Grid step.
+    :type step: float
+
+    :param n:
+        Number of grid points.
+    :type n: int
+
+    :param lags:
+        Minimum and maximum lags to search.
+    :type lags: int, int
+
+    :param strategy:
+        Search strategy ('full' or 'pyramid').
+    :type strategy: str
+    """
+
+    def __init__(self, ref, start, step, n, lags=None, strategy='full'):
+        self.args = ref, start, step, n, lags
+        self.strategy, self.correlator = strategy, None
+        if strategy == 'full' and (lags is None or lags == full_lags(n)):
+            self.correlator = Correlator(sampler(*ref, start, step)(
+                np.arange(n)
+            ))
+
+    def __call__(self, data):
+        """
+        Searches the lags of maximum correlation.
+
+        :param data:
+            Signals (x, y) to correlate.
+        :type data: list[tuple[numpy.array]]
+
+        :return:
+            Lags of maximum correlation.
+        :rtype: list[int]
+        """
+        ref, start, step, n, lags = self.args
+        if self.correlator is not None:
+            i, lag = np.arange(n), self.correlator.lag
+            return [lag(sampler(*d, start, step)(i)) for d in data]
+        func = pyramid_lags if self.strategy == 'pyramid' else search_lags
+        return func(ref, data, start, step, n, lags)
+
+
+_worker = {}
+
+
+def _close_worker():
+    shm = _worker.pop('shm', None)
+    _worker.clear()  # Releases the views of the shared memory.
+    if shm is not None:
+        shm.close()
+
+
+def _init_worker(name, shape, dtype, *args):
+    import sys
+    from multiprocessing import shared_memory, resource_tracker, util
+    # Only the parent, which unlinks it, tracks the shared memory. Workers do
+    # not unregister it, because they may share the parent's tracker.
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name, track=False)
+    else:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            shm = shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+    ref = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker.update(shm=shm, searcher=Searcher(ref, *args))
+    util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _worker_lag(d):
+    return _worker['searcher']([d])[0]
+
+
+def search(ref, data, start, step, n, lags=None, strategy='full', jobs=1,
+           executor='thread'):
+    """
+    Searches the lags of maximum correlation of the signals with the reference,
+    optionally spreading the signals over a pool of workers.
+
+    The results do not depend on the number of workers. With a process pool,
+    the reference is placed once in shared memory and attached by each worker.
+
+    :param ref:
+        Reference signal (x, y).
+    :type ref: tuple[numpy.array]
+
+    :param data:
+        Signals (x, y) to correlate.
+    :type data: list[tuple[numpy.array]]
+
+    :param start:
+        Grid start.
+    :type start: float
+
+    :param step:
+        Grid step.
+    :type step: float
+
+    :param n:
+        Number of grid points.
+    :type n: int
+
+    :param lags:
+        Minimum and maximum lags to search.
+    :type lags: int, int
+
+    :param strategy:
+        Search strategy ('full' or 'pyramid').
+    :type strategy: str
+
+    :param jobs:
+        Number of workers. If None, it is the number of CPUs.
+    :type jobs: int
+
+    :param executor:
+        Pool type ('thread' or 'process').
+    :type executor: str
+
+    :return:
+        Lags of maximum correlation.
+    :rtype: list[int]
+    """
+    import os
+    jobs = min(jobs or os.cpu_count() or 1, len(data))
+    args = start, step, n, lags, strategy
+    if jobs <= 1:
+        return Searcher(ref, *args)(data)
+    if executor == 'thread':
+        from concurrent.futures import ThreadPoolExecutor
+        searcher = Searcher(ref, *args)
+        with ThreadPoolExecutor(jobs) as pool:
+            return [r[0] for r in pool.map(searcher, [[d] for d in data])]
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    ref = np.asarray(ref)
+    ref = ref.astype(float_dtype(ref.dtype), copy=False)
+    shm = shared_memory.SharedMemory(create=True, size=max(ref.nbytes, 1))
+    try:
+        np.ndarray(ref.shape, dtype=ref.dtype, buffer=shm.buf)[:] = ref
+        with ProcessPoolExecutor(
+                jobs, initializer=_init_worker,
+                initargs=(shm.name, ref.shape, ref.dtype.str) + args) as pool:
+            return list(pool.map(_worker_lag, data))
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+It contains the file processing chain model `dsp`.
+"""
+import numpy as np
+import functools
+import schedula as sh
+from syncing import model
+from syncing.rw import read, write
+
+#: Processing Model.
+dsp = sh.BlueDispatcher(name='Processing Model', raises=True)
+
+dsp.add_data('interpolation_method', 'linear')
+dsp.add_data('dtype', 'float64')
+dsp.add_dispatcher(
+    read.dsp,
+    inputs=['input_fpath', 'header', 'sets_mapping_fpath', 'labels_fpath',
+            'methods_fpath', 'interpolation_method', 'x_label', 'y_label',
+            'data_names', 'excel_engine', 'excel_cache',
+            'excel_cache_dir', 'dtype'],
+    outputs=['raw_data', 'reference_name', 'sets_mapping', 'labels', 'methods'],
+    include_defaults=True
+)
+
+
+@sh.add_function(dsp, inputs_kwargs=True, outputs=['data'])
+def parse_data(raw_data, sets_mapping=None, dtype=None):
+    """
+    Extract and rename the data-sets to _process.
+
+    :param raw_data:
+        Raw Data.
+    :type raw_data: dict[str, syncing.model.dataset.DataSet | dict]
+
+    :param sets_mapping:
+        Mapping of data-sets to _process.
+
+        It is like `{"<set-name>": {"<new-name>": "<old-name>", ...}, ...}`.
+    :type sets_mapping: dict[str, dict[str, str]]
+
+    :param dtype:
+        Float type of the data-sets ('float64' or 'float32'). If None, the
+        data types are kept.
+    :type dtype: str
+
+    :return:
+        Model data.
+    :rtype: dict[str, syncing.model.dataset.DataSet | dict]
+    """
+    from syncing.model.dataset import DataSet, columnar
+    if sets_mapping is None:
+        data = raw_data
+    else:
+        data = {}
+        for i, mapping in sets_mapping.items():
+            if isinstance(raw_data[i], DataSet):
+                data[i] = raw_data[i].select(mapping.values(), mapping)
+            else:
+                data[i] = {j: raw_data[i][k] for j, k in mapping.items()}
+    parsed_data = {}
+    for i, v in data.items():
+        v = columnar(v, dtype)
+        if isinstance(v, DataSet):
+            if dtype is not None and v.values.dtype != dtype:
+                v = DataSet(v.values, v.columns, dtype)
+            v = v.dropna()
+        else:
+            if dtype is not None:
+                v = {j: np.asarray(u, dtype) for j, u in v.items()}
+            v = {j: u for j, u in v.items() if not np.isnan(u).all()}
+        if v:
+            parsed_data[i] = v
+    return parsed_data
+
+
+dsp.add_data('x_label', 'x')
+dsp.add_data('y_label', 'y')
+dsp.add_data('labels', None, sh.inf(1, 0))
+dsp.add_data('methods', None, sh.inf(1, 0))
+dsp.add_data('sets_mapping', None, sh.inf(1, 0))
+dsp.add_data('no_sync', False)
+dsp.add_data('shift_search', 'full')
+dsp.add_data('max_shift', None)
+dsp.add_data('jobs', 1)
+dsp.add_data('executor', 'thread')
+dsp.add_data('chunk_size', None)
+dsp.add_data('cache_dir', None)
+dsp.add_data('cache_size', 1024)
+input_keys = [
+    'methods', 'data', 'reference_name', 'labels', 'x_label', 'y_label',
+    'interpolation_method', 'no_sync', 'shift_search', 'max_shift', 'jobs',
+    'executor', 'chunk_size', 'cache_dir', 'cache_size'
+]
+
+dsp.add_function(
+    function_id='map_inputs',
+    function=functools.partial(sh.map_list, input_keys),
+    filters=[lambda x: {k: v for k, v in x.items() if v is not None}],
+    inputs=input_keys,
+    outputs=['inputs']
+)
+
+dsp.add_function(
+    function_id='compute_outputs',
+    function=sh.SubDispatch(model.dsp),
+    inputs=['inputs'],
+    outputs=['outputs'],
+    description='Executes the computational model.'
+)
+
+dsp.add_dispatcher(
+    write.dsp,
+    inputs=['outputs', 'output_fpath', 'template_fpath', 'excel_engine',
+            'json_precision', 'json_compact'],
+    outputs=['written'],
+    include_defaults=True
+)
+
+
+def _frame_to_data(df, dtype='float64'):
+    from syncing.model.dataset import DataSet
+    try:
+        return DataSet(df.to_numpy(dtype), df.columns)
+    except (ValueError, TypeError):  # Not numeric.
+        return {k: v.values for k, v in df.items()}
+
+
+def synchronise(data, reference_name=None, x_label='x', y_label='y',
+                labels=None, interpolation_method='linear', methods=None,
+                sets_mapping=None, no_sync=False, shift_search='full',
+                max_shift=None, jobs=1, executor='thread', chunk_size=None,
+                cache_dir=None, cache_size=1024, dtype='float64'):
+    """
+    Synchronises and re-samples in-memory data-sets.
+
+    It runs the same chain of `dsp` without reading and writing files: the
+    inputs are validated once and the model functions are called directly
+    (i.e., without dispatching).
+
+    Example::
+
+        >>> import numpy as np
+        >>> x = np.arange(100.)
+        >>> shifts, resampled = synchronise({
+        ...     'ref': {'x': x, 'y': np.sin(x / 10)},
+        ...     'obd': {'x': x + 5, 'y': np.sin(x / 10)},
+        ... })
+        >>> round(shifts['obd'])
+        5
+        >>> sorted(resampled)
+        ['obd', 'ref']
+
+    :param data:
+        Data-sets like `{"<set-name>": {"<var-name>": array}}`, or
+        `{"<set-name>": pandas.DataFrame}`.
+    :type data: dict[str, dict | pandas.DataFrame]
+
+    :param reference_name:
+        Reference data-set name. If None, it is the first data-set.
+    :type reference_name: str
+
+    :param x_label:
+        Default `var-name` of the common x-axis to synchronise and re-sampled
+        the data-sets.
+    :type x_label: str
+
+    :param y_label:
+        Default `var-name` of the common y-axis to synchronise the data-sets.
+    :type y_label: str
+
+    :param labels:
+        Reference-labels (i.e., "x", "y") of the data-sets that do not use the
+        default labels.
+
+        It is like `{"<set-name>": {"x": "<x-label>", "y": "<y-label>"}, ...}`.
+    :type labels: dict[str, dict[str, str]]
+
+    :param interpolation_method:
+        Default interpolation method.
+    :type interpolation_method: str
+
+    :param methods:
+        Interpolation methods of the variables that do not use the default.
+
+        It is like `{"<set-name>": {"<var-name>": "<interp>", ...}, ...}`.
+    :type methods: dict[str, dict[str, str]]
+
+    :param sets_mapping:
+        Mapping of data-sets to _process.
+
+        It is like `{"<set-name>": {"<new-name>": "<old-name>", ...}, ...}`.
+    :type sets_mapping: dict[str, dict[str, str]]
+
+    :param no_sync:
+        Skip the data synchronisation?
+    :type no_sync: bool
+
+    :param shift_search:
+        Shift search strategy ('full' or 'pyramid').
+    :type shift_search: str
+
+    :param max_shift:
+        Maximum absolute shift from the reference data-set.
+    :type max_shift: float
+
+    :param jobs:
+        Number of workers computing the shifts of the data-sets in parallel.
+        If 0, it is the number of CPUs.
+    :type jobs: int
+
+    :param executor:
+        Pool type of the workers ('thread' or 'process').
+    :type executor: str
+
+    :param chunk_size:
+        Number of reference samples re-sampled at once (out-of-core
+        re-sampling with bounded memory).
+    :type chunk_size: int
+
+    :param cache_dir:
+        Directory of the result cache. If given, the shifts and the re-sampled
+        data-sets whose inputs are unchanged are loaded from the cache.
+    :type cache_dir: str
+
+    :param cache_size:
+        Maximum size of the result cache [MB] (least recently used results are
+        evicted).
+    :type cache_size: float
+
+    :param dtype:
+        Float type of the data-sets, used to search the shifts and to re-sample
+        ('float64' or 'float32'). With 'float32' the memory and the bandwidth
+        are halved, but the x-axes keep only 24 significant bits (i.e., a
+        resolution of `|x| * 6e-8`) and the correlation is computed in single
+        precision: the shifts may differ from the 'float64' ones by up to one
+        grid step (i.e., a tenth of the median sampling step of the
+        reference), as long as the x-axis resolution is finer than the
+        sampling step. Hence, keep 'float64' for x-axes with a large offset
+        (e.g., UNIX timestamps).
+    :type dtype: str
+
+    :return:
+        Shifts from the reference data-set and re-sampled data-sets (as
+        `pandas.DataFrame` if the input data-sets are DataFrames).
+    :rtype: dict[str, float], dict
+    """
+    import sys
+    from syncing.model.interp import METHODS
+    from syncing.model.dataset import DTYPES
+    if dtype not in DTYPES:
+        raise ValueError('Invalid dtype %r.' % dtype)
+    pd = sys.modules.get('pandas')  # Inputs cannot be DataFrames without it.
+    frames = bool(data) and pd is not None and all(
+        isinstance(v, pd.DataFrame) for v in data.values()
+    )
+    if frames:
+        data = {k: _frame_to_data(v, dtype) for k, v in data.items()}
+    if reference_name is None:
+        reference_name = next(iter(data), None)
+    data = parse_data(data, sets_mapping, dtype)
+    if reference_name not in data:
+        raise ValueError('Reference data-set %r not found.' % reference_name)
+    if shift_search not in ('full', 'pyramid'):
+        raise ValueError('Invalid shift search %r.' % shift_search)
+    if max_shift is not None and max_shift < 0:
+        raise ValueError('Invalid max shift %r, it must be >= 0.' % max_shift)
+    for k, v in sh.stack_nested_keys(methods or {}):
+        if isinstance(v, str) and v not in METHODS:
+            raise ValueError('Invalid interpolation method %r.' % v)
+    if interpolation_method not in METHODS:
+        raise ValueError(
+            'Invalid interpolation method %r.' % interpolation_method
+        )
+
+    _labels, labels = labels, model.define_labels(x_label, y_label)
+    labels.update(_labels or {})
+    for k, v in data.items():
+        keys = ('x',) if no_sync else ('x', 'y')
+        missing = [labels[k][i] for i in keys if labels[k][i] not in v]
+        if missing:
+            raise ValueError('Data-set %r has not the variables %r.' % (
+                k, missing
+            ))
+    _methods = methods
+    methods = model.define_interpolation_methods(interpolation_method)
+    for k, v in sh.stack_nested_keys(_methods or {}):
+        methods[k[0]][sh.bypass(*k[1:])] = METHODS.get(v, v)
+
+    shifts = model.calculate_shifts(
+        labels, reference_name, data, no_sync, shift_search, max_shift, jobs,
+        executor, cache_dir, cache_size
+    )
+    resampled = model.resample_data(
+        labels, reference_name, data, shifts, methods, chunk_size, cache_dir,
+        cache_size
+    )
+    if frames:
+        resampled = {
+            k: pd.DataFrame({
+                sh.bypass(*i): u for i, u in sh.stack_nested_keys(v)
+            }) for k, v in resampled.items()
+        }
+    return shifts, resampled
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+It contains a profiler of the processing model that records the wall time, the
+CPU time, and the peak memory allocation of each function node (including the
+ones of the sub-dispatchers) and of each data-set.
+
+Usage::
+
+    import schedula as sh
+    from syncing.process import dsp
+    with Profiler() as profiler:
+        sh.SubDispatch(dsp, ['written'])(inputs, _verbose=profiler)
+    profiler.save('profile.json')
+"""
+import time
+import tracemalloc
+
+_active = None  # Running profiler.
+
+
+def is_active():
+    """
+    Returns if a profiler is running.
+
+    :return:
+        Is a profiler running?
+    :rtype: bool
+    """
+    return _active is not None
+
+
+class _NoSection:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+_no_section = _NoSection()
+
+
+def section(stage, name):
+    """
+    Returns a context that profiles the processing of a data-set, if a profiler
+    is running.
+
+    :param stage:
+        Processing stage (e.g., 'shifts').
+    :type stage: str
+
+    :param name:
+        Data-set name.
+    :type name: str
+
+    :return:
+        Profiling context.
+    :rtype: contextlib.AbstractContextManager
+    """
+    return _no_section if _active is None else _active.section(stage, name)
+
+
+def _peak():
+    return tracemalloc.get_traced_memory()[1]
+
+
+class _Section:
+    def __init__(self, profiler, records, **info):
+        self.profiler, self.records, self.info = profiler, records, info
+
+    def __enter__(self):
+        self.profiler._push()
+
+    def __exit__(self, *args):
+        self.records.append(dict(self.info, **self.profiler._pop()))
+
+
+class Profiler:
+    """
+    Profiler of the processing model.
+
+    It is used as `_verbose` callback of the dispatch, hence it is called at the
+    start and at the end of each function node. The memory is traced with
+    :mod:`tracemalloc` while the profiler is running, which slows down the
+    execution.
+
+    :ivar nodes:
+        Records of the function nodes in the order of completion, i.e.
+        `{"node": "<sub-dispatcher>/<node>", "wall": s, "cpu": s,
+        "peak": MB}`.
+    :vartype nodes: list[dict]
+
+    :ivar data_sets:
+        Records of the data-sets, i.e. `{"stage": "<stage>", "name":
+        "<set-name>", "wall": s, "cpu": s, "peak": MB}`.
+    :vartype data_sets: list[dict]
+    """
+
+    def __init__(self):
+        self.nodes, self.data_sets, self.total, self._stack = [], [], {}, []
+        self._tracing = False
+
+    def __enter__(self):
+        global _active
+        self._tracing = not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        _active = self
+        self._push()
+        return self
+
+    def __exit__(self, *args):
+        global _active
+        self.total = self._pop()
+        _active = None
+        if self._tracing:
+            tracemalloc.stop()
+
+    def _push(self):
+        if self._stack:  # The peak is reset for the nested record.
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], _peak())
+        if hasattr(tracemalloc, 'reset_peak'):  # Python >= 3.9.
+            tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        self._stack.append({
+            'wall': time.perf_counter(), 'cpu': time.process_time(),
+            'base': current, 'peak': current
+        })
+
+    def _pop(self):
+        wall, cpu = time.perf_counter(), time.process_time()
+        record = self._stack.pop()
+        peak = max(record['peak'], _peak())
+        if self._stack:
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+        return {
+            'wall': wall - record['wall'], 'cpu': cpu - record['cpu'],
+            'peak': (peak - record['base']) / 2 ** 20
+        }
+
+    def __call__(self, sol, node_id, attr, end=False):
+        if not end:
+            self._push()
+        elif self._stack:
+            node = '/'.join(sol.full_name + (node_id,))
+            self.nodes.append(dict(node=node, **self._pop()))
+
+    def section(self, stage, name):
+        """
+        Returns a context that profiles the processing of a data-set.
+
+        :param stage:
+            Processing stage (e.g., 'shifts').
+        :type stage: str
+
+        :param name:
+            Data-set name.
+        :type name: str
+
+        :return:
+            Profiling context.
+        :rtype: contextlib.AbstractContextManager
+        """
+        return _Section(self, self.data_sets, stage=stage, name=name)
+
+    def report(self):
+        """
+        Returns the profiling report.
+
+        :return:
+            Profiling report, i.e. `{"total": {...}, "nodes": [...],
+            "data_sets": [...]}`.
+        :rtype: dict
+        """
+        return {
+            'total': self.total, 'nodes': self.nodes,
+            'data_sets': self.data_sets
+        }
+
+    def save(self, fpath):
+        """
+        Saves the profiling report in a JSON file.
+
+        :param fpath:
+            File path (`.json`).
+        :type fpath: str
+        """
+        import json
+        with open(fpath, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def table(self, top=5):
+        """
+        Returns a short table of the function nodes and of the slowest
+        data-sets of each stage.
+
+        :param top:
+            Number of data-sets listed for each stage.
+        :type top: int
+
+        :return:
+            Profiling table.
+        :rtype: str
+        """
+        fmt = '%-44s %10s %10s %10s'
+        lines = [fmt % ('node', 'wall [s]', 'cpu [s]', 'peak [MB]')]
+        fmt = '%-44s %10.3f %10.3f %10.1f'
+        for r in self.nodes:
+            lines.append(fmt % (r['node'], r['wall'], r['cpu'], r['peak']))
+        stages = {}
+        for r in self.data_sets:
+            stages.setdefault(r['stage'], []).append(r)
+        for stage, records in stages.items():
+            records = sorted(records, key=lambda r: -r['wall'])[:top]
+            for r in records:
+                name = '%s[%s]' % (stage, r['name'])
+                lines.append(fmt % (name, r['wall'], r['cpu'], r['peak']))
+        if self.total:
+            r = self.total
+            lines.append(fmt % ('total', r['wall'], r['cpu'], r['peak']))
+        return '\n'.join(lines)
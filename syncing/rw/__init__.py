@@ -37,6 +37,6 @@ def file_ext(*ext):
 
     # noinspection PyUnusedLocal
     def domain(fpath, *args):
-        return fpath.lower().endswith(ext)
+        return fpath.lower().rstrip('/\\').endswith(ext)
 
     return domain
@@ -8,6 +8,9 @@
 """
 It contains functions and a model `dsp` to read input files.
 """
+import os
+import re
+import os.path as osp
 import schedula as sh
 from . import file_ext
 
@@ -110,10 +113,14 @@ dsp.add_data('reference_name', description='Reference data-set name.')
 @sh.add_function(dsp, outputs=['raw_data', 'reference_name'],
                  inputs_kwargs=True, inputs_defaults=True,
                  input_domain=file_ext('xlsx', 'xls'))
-def read_excel(input_fpath, header=0, data_names=None):
+def read_excel(input_fpath, header=0, data_names=None, sets_mapping=None,
+               excel_engine='stream', excel_cache='off', excel_cache_dir=None,
+               dtype='float64'):
     """
     Reads the excel file.
 
+    If `sets_mapping` is given, only the mapped sheets and columns are read.
+
     :param input_fpath:
         Input file path.
     :type input_fpath: str
@@ -126,29 +133,417 @@ def read_excel(input_fpath, header=0, data_names=None):
         Data names to filter out the data sets to synchronise.
     :type data_names: list
 
+    :param sets_mapping:
+        Mapping of data-sets to _process.
+
+        It is like `{"<set-name>": {"<new-name>": "<old-name>", ...}, ...}`.
+    :type sets_mapping: dict[str, dict[str, str]]
+
+    :param excel_engine:
+        Engine to parse the `.xlsx` sheets:
+
+            + 'stream': the rows are streamed (read-only) straight into a
+              float block. Sheets that are not numeric fall back to 'pandas'.
+            + 'pandas': the sheets are parsed with :func:`pandas.read_excel`.
+    :type excel_engine: str
+
+    :param excel_cache:
+        Usage of the parsed-input sidecar (see :func:`excel_sidecar`). The
+        sidecars are not evicted, hence they are opt-in and can be removed with
+        :func:`purge_excel_cache`:
+
+            + 'on': the data are loaded from the sidecar if it is valid,
+              otherwise the workbook is parsed and the sidecar is written.
+            + 'refresh': the workbook is parsed and the sidecar is rewritten.
+            + 'off': the workbook is parsed and the sidecar is not used.
+    :type excel_cache: str
+
+    :param excel_cache_dir:
+        Directory of the sidecars. If None, it is
+        :func:`default_excel_cache_dir`.
+    :type excel_cache_dir: str
+
+    :param dtype:
+        Float type of the data-sets ('float64' or 'float32').
+    :type dtype: str
+
     :return:
         Raw data-sets and reference data-set name.
-    :rtype: dict[str, dict[str, numpy.array]], str
+    :rtype: dict[str, syncing.model.dataset.DataSet | dict], str
+    """
+    sidecar = None
+    if excel_cache != 'off':
+        sidecar = excel_sidecar(
+            input_fpath, header, data_names, sets_mapping, excel_engine,
+            excel_cache_dir, dtype
+        )
+        if excel_cache == 'on':
+            res = _load_sidecar(input_fpath, sidecar)
+            if res is not None:
+                return res
+    data, reference_name = _parse_excel(
+        input_fpath, header, data_names, sets_mapping, excel_engine, dtype
+    )
+    if sidecar is not None:
+        _save_sidecar(input_fpath, sidecar, data, reference_name)
+    return data, reference_name
+
+
+def default_excel_cache_dir():
+    """
+    Returns the default directory of the parsed-input sidecars of the Excel
+    workbooks (i.e., `$SYNCING_CACHE_DIR/excel`, where the default of
+    `SYNCING_CACHE_DIR` is `~/.cache/syncing`).
+
+    :return:
+        Directory of the sidecars.
+    :rtype: str
+    """
+    return osp.join(os.environ.get('SYNCING_CACHE_DIR') or osp.join(
+        osp.expanduser('~'), '.cache', 'syncing'
+    ), 'excel')
+
+
+def excel_sidecar(input_fpath, header=0, data_names=None, sets_mapping=None,
+                  excel_engine='stream', excel_cache_dir=None,
+                  dtype='float64'):
+    """
+    Returns the path of the parsed-input sidecar of an Excel workbook.
+
+    The sidecar is a NumPy directory (see :func:`read_npy`) keyed by the
+    workbook path and the parsing options. It is valid only if the workbook
+    size and modification time, and the package version are the ones recorded
+    when it was written, otherwise the workbook is parsed again.
+
+    :param input_fpath:
+        Input file path.
+    :type input_fpath: str
+
+    :param header:
+        Row (0-indexed) to use for the column labels.
+    :type header: str
+
+    :param data_names:
+        Data names to filter out the data sets to synchronise.
+    :type data_names: list
+
+    :param sets_mapping:
+        Mapping of data-sets to _process.
+    :type sets_mapping: dict[str, dict[str, str]]
+
+    :param excel_engine:
+        Engine to parse the `.xlsx` sheets.
+    :type excel_engine: str
+
+    :param excel_cache_dir:
+        Directory of the sidecars. If None, it is
+        :func:`default_excel_cache_dir`.
+    :type excel_cache_dir: str
+
+    :param dtype:
+        Float type of the data-sets ('float64' or 'float32').
+    :type dtype: str
+
+    :return:
+        Sidecar directory path.
+    :rtype: str
+    """
+    import json
+    import hashlib
+    key = [
+        osp.abspath(input_fpath), header, list(data_names or ()), sets_mapping,
+        excel_engine
+    ]
+    if dtype != 'float64':  # Double precision sidecars keep their keys.
+        key.append(dtype)
+    key = json.dumps(key)
+    key = hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+    return osp.join(excel_cache_dir or default_excel_cache_dir(), key)
+
+
+def _source(input_fpath):
+    from syncing import __version__
+    stat = os.stat(input_fpath)
+    return {
+        'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+        'version': __version__
+    }
+
+
+def _load_sidecar(input_fpath, sidecar):
+    # Returns the data of the sidecar, or None if it is missing or stale.
+    import json
+    try:
+        with open(osp.join(sidecar, 'source.json')) as file:
+            source = json.load(file)
+        reference_name = source.pop('reference_name')
+        if source != _source(input_fpath):
+            return None
+        return read_npy(sidecar)[0], reference_name
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save_sidecar(input_fpath, sidecar, data, reference_name):
+    # Only numeric workbooks are stored. The sidecar is written in a temporary
+    # directory and then moved, hence readers never see partial sidecars.
+    import json
+    import shutil
+    import logging
+    from syncing.model.dataset import DataSet
+    from .write import save_npy
+    if not all(isinstance(v, DataSet) for v in data.values()):
+        return
+    temp = '%s.%d.tmp' % (sidecar, os.getpid())
+    try:
+        save_npy(temp, {'resampled': data})
+        with open(osp.join(temp, 'source.json'), 'w') as file:
+            json.dump(dict(
+                _source(input_fpath), reference_name=reference_name
+            ), file)
+        shutil.rmtree(sidecar, ignore_errors=True)
+        os.replace(temp, sidecar)
+    except OSError as ex:  # E.g., read-only or full disk.
+        shutil.rmtree(temp, ignore_errors=True)
+        logging.getLogger(__name__).warning(
+            'Excel sidecar not written: %s', ex
+        )
+
+
+def purge_excel_cache(excel_cache_dir=None):
     """
+    Removes all parsed-input sidecars of the Excel workbooks.
+
+    :param excel_cache_dir:
+        Directory of the sidecars. If None, it is
+        :func:`default_excel_cache_dir`.
+    :type excel_cache_dir: str
+
+    :return:
+        Removed directory.
+    :rtype: str
+    """
+    import shutil
+    excel_cache_dir = excel_cache_dir or default_excel_cache_dir()
+    shutil.rmtree(excel_cache_dir, ignore_errors=True)
+    return excel_cache_dir
+
+
+def _parse_excel(input_fpath, header, data_names, sets_mapping, excel_engine,
+                 dtype='float64'):
     import pandas as pd
+    from syncing.profiling import section
     engine = input_fpath.endswith('.xlsx') and 'openpyxl' or 'xlrd'
+    stream = engine == 'openpyxl' and excel_engine == 'stream'
     with pd.ExcelFile(input_fpath, engine=engine) as xls:
         data, names = {}, xls.sheet_names
         sheet_names = list(data_names or names)
-        for sheet_name, df in pd.read_excel(xls, sheet_name=sheet_names, header=header).items():
-            if not df.empty:
-                data[sheet_name] = {k: v.values for k, v in df.items()}
+        for sheet_name, usecols in _excel_columns(
+                sheet_names, header, sets_mapping):
+            with section('read', sheet_name):
+                ds = _read_sheet(
+                    xls, sheet_name, header, usecols, stream, dtype
+                )
+            if ds:
+                data[sheet_name] = ds
         return data, sheet_names[0]
 
 
+def _read_sheet(xls, sheet_name, header, usecols, stream, dtype='float64'):
+    import pandas as pd
+    from syncing.model.dataset import DataSet
+    if stream:
+        ds = _stream_sheet(xls, sheet_name, header, usecols, dtype)
+        if ds is not None:
+            return ds
+    df = pd.read_excel(
+        xls, sheet_name=sheet_name, header=header, usecols=usecols
+    )
+    if df.empty:
+        return None
+    try:
+        return DataSet(df.to_numpy(dtype), df.columns)
+    except (ValueError, TypeError):  # Not numeric.
+        return {k: v.values for k, v in df.items()}
+
+
+def _stream_sheet(xls, sheet_name, header, usecols, dtype='float64',
+                  chunk_size=4096):
+    # Returns the data-set, `{}` if it is empty, or None if the sheet cannot be
+    # streamed (i.e., not numeric or irregular) and `pandas` has to parse it.
+    import operator
+    import numpy as np
+    import pandas as pd
+    from syncing.model.dataset import DataSet
+    columns = pd.read_excel(
+        xls, sheet_name=sheet_name, header=header, nrows=0
+    ).columns
+    width = len(columns)
+    if not width:
+        return None
+    idx = [i for i, k in enumerate(columns) if usecols is None or usecols(k)]
+    if not idx:
+        return {}
+    start = (header if isinstance(header, int) else max(header)) + 1
+    ws = xls.book[sheet_name]
+    values = np.empty(
+        (max((ws.max_row or 0) - start, 1), len(idx)), dtype=dtype, order='F'
+    )
+    n = last = 0
+    buffer, blank, get = [], (None,) * width, operator.itemgetter(*idx)
+
+    def flush():
+        nonlocal values, n
+        block = np.array(buffer, dtype=float).reshape(len(buffer), -1)
+        if n + len(block) > len(values):
+            values = np.concatenate(
+                (values, np.empty_like(values, shape=(
+                    max(len(values), len(block)), len(idx)
+                ))))
+        values[n:n + len(block)] = block
+        n += len(block)
+        buffer.clear()
+
+    try:
+        for row in ws.iter_rows(min_row=start + 1, values_only=True):
+            if len(row) < width:
+                row += blank[len(row):]
+            elif len(row) > width and row[width:].count(None) != \
+                    len(row) - width:
+                return None  # Values without header.
+            if row.count(None) != len(row):
+                last = n + len(buffer) + 1
+            buffer.append(get(row))
+            if len(buffer) == chunk_size:
+                flush()
+        if buffer:
+            flush()
+    except (ValueError, TypeError):  # Not numeric.
+        return None
+    if not last:
+        return {}
+    return DataSet(values[:last], columns[idx])
+
+
+def _excel_columns(sheet_names, header, sets_mapping):
+    # The labels and the methods refer to the mapped names, hence the mapping
+    # defines all the needed columns (multi-row headers are read in full).
+    if sets_mapping is None:
+        return [(k, None) for k in sheet_names]
+    single = isinstance(header, int) or len(header) == 1
+    res = []
+    for k in sheet_names:
+        if k in sets_mapping:
+            usecols = None
+            if single:
+                usecols = set(sets_mapping[k].values()).__contains__
+            res.append((k, usecols))
+    return res
+
+
+_JSON_WS = re.compile(rb'\s*')
+_JSON_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"')
+_JSON_SCALAR = re.compile(
+    rb'-?(?:Infinity|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)|NaN|true|false|null'
+)
+
+
+def _json_any(buf, chars, i, j):
+    # Checks if any of the `chars` is in `buf[i:j]`.
+    return any(buf.find(c, i, j) >= 0 for c in chars)
+
+
+def _json_match(regex, buf, i):
+    m = regex.match(buf, i)
+    if m is None:
+        raise ValueError('Invalid JSON value at %d.' % i)
+    return m.end()
+
+
+def _json_skip(buf, i):
+    # Returns the end of the JSON value starting at `i`, without parsing it.
+    c = buf[i:i + 1]
+    if c == b'"':
+        return _json_match(_JSON_STRING, buf, i)
+    if not c or c not in b'[{':
+        return _json_match(_JSON_SCALAR, buf, i)
+    if c == b'[':
+        j = buf.find(b']', i)
+        if j >= 0 and not _json_any(buf, (b'[', b'{', b'"'), i + 1, j):
+            return j + 1  # Flat list.
+    end = b']' if c == b'[' else b'}'
+    i = _JSON_WS.match(buf, i + 1).end()
+    while buf[i:i + 1] != end:
+        if not buf[i:i + 1]:
+            raise ValueError('Unterminated JSON value.')
+        if end == b'}':
+            i = _JSON_WS.match(buf, _json_match(_JSON_STRING, buf, i)).end()
+            i = _JSON_WS.match(buf, i + 1).end()  # Skip the `:`.
+        i = _JSON_WS.match(buf, _json_skip(buf, i)).end()
+        if buf[i:i + 1] == b',':
+            i = _JSON_WS.match(buf, i + 1).end()
+    return i + 1
+
+
+def _json_array(buf, i, j, dtype='float64'):
+    # Parses the JSON value `buf[i:j]` into an array, numeric flat lists are
+    # parsed straight from the text (the floats into `dtype`).
+    import json
+    import warnings
+    import numpy as np
+    text = buf[i:j]
+    # Letters `u` and `l` are only in `true`, `false`, and `null` literals.
+    if text[:1] == b'[' and not _json_any(
+            buf, (b'[', b'{', b'"', b'u', b'l'), i + 1, j):
+        text = text[1:-1].decode()
+        if not text.strip():
+            return np.array([])
+        if not _json_any(buf, (b'.', b'e', b'E', b'N', b'I'), i, j):
+            dtype = int
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            a = np.fromstring(text, dtype=dtype, sep=',')
+        if len(a) == text.count(',') + 1:
+            return a
+    return np.array(json.loads(text))
+
+
+def _json_items(buf, i, key=(), names=None, dtype='float64'):
+    # Yields the leaves of the JSON object starting at `i` like
+    # `sh.stack_nested_keys`, skipping the top-level keys not in `names`.
+    import json
+    i = _JSON_WS.match(buf, i + 1).end()
+    while buf[i:i + 1] != b'}':
+        j = _json_match(_JSON_STRING, buf, i)
+        k = key + (json.loads(buf[i:j]),)
+        i = _JSON_WS.match(buf, j).end() + 1  # Skip the `:`.
+        i = _JSON_WS.match(buf, i).end()
+        if names and k[0] not in names:
+            i = _json_skip(buf, i)
+        elif buf[i:i + 1] == b'{':
+            i = yield from _json_items(buf, i, k, dtype=dtype)
+        else:
+            j = _json_skip(buf, i)
+            yield k, _json_array(buf, i, j, dtype)
+            i = j
+        i = _JSON_WS.match(buf, i).end()
+        if buf[i:i + 1] == b',':
+            i = _JSON_WS.match(buf, i + 1).end()
+    return i + 1
+
+
 @sh.add_function(
     dsp, inputs_kwargs=True, inputs_defaults=True, outputs=['raw_data'],
     input_domain=file_ext('json')
 )
-def read_json(input_fpath, data_names=None):
+def read_json(input_fpath, data_names=None, dtype='float64'):
     """
     Reads the json file.
 
+    The file is memory-mapped and parsed incrementally: the data-sets not in
+    `data_names` are skipped without being parsed and the numeric lists are
+    converted straight into arrays.
+
     :param input_fpath:
         Input file path.
     :type input_fpath: str
@@ -157,15 +552,235 @@ def read_json(input_fpath, data_names=None):
         Data names to filter out the data sets to synchronise.
     :type data_names: list
 
+    :param dtype:
+        Float type of the data-sets ('float64' or 'float32').
+    :type dtype: str
+
     :return:
         Raw data-sets.
-    :rtype: dict[str, dict[str, numpy.array]]
+    :rtype: dict[str, syncing.model.dataset.DataSet | dict]
+    """
+    import mmap
+    from syncing.model.dataset import columnar
+    data = {}
+    with open(input_fpath, 'rb') as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        i = _JSON_WS.match(buf).end()
+        if buf[i:i + 1] != b'{':
+            raise ValueError('The JSON file must contain an object.')
+        for k, v in _json_items(buf, i, names=data_names, dtype=dtype):
+            sh.get_nested_dicts(data, k[0])[sh.bypass(*k[1:])] = v
+        return {k: columnar(v, dtype) for k, v in data.items()}
+
+
+@sh.add_function(dsp, outputs=['raw_data', 'reference_name'],
+                 inputs_kwargs=True, inputs_defaults=True,
+                 input_domain=file_ext('npy'))
+def read_npy(input_fpath, data_names=None, dtype=None):
+    """
+    Reads the NumPy directory, memory-mapping the data-sets (i.e., the data are
+    loaded lazily and without copies, unless they are converted to `dtype`).
+
+    The directory (`.npy`) contains a `manifest.json` and a `.npy` file for each
+    data-set, i.e. a Fortran-ordered 2-D block with a column for each variable.
+
+    :param input_fpath:
+        Input directory path.
+    :type input_fpath: str
+
+    :param data_names:
+        Data names to filter out the data sets to synchronise.
+    :type data_names: list
+
+    :param dtype:
+        Float type of the data-sets ('float64' or 'float32'). If None, it is
+        the stored one.
+    :type dtype: str
+
+    :return:
+        Raw data-sets and reference data-set name.
+    :rtype: dict[str, syncing.model.dataset.DataSet], str
     """
     import json
     import numpy as np
+    import os.path as osp
+    from syncing.model.dataset import DataSet
+    with open(osp.join(input_fpath, 'manifest.json')) as file:
+        sets = {d['name']: d for d in json.load(file)['data']}
+    data = {}
+    for name in list(data_names or sets):
+        d = sets[name]
+        values = np.load(osp.join(input_fpath, d['file']), mmap_mode='r')
+        data[name] = DataSet(values, [
+            tuple(k) if isinstance(k, list) else k for k in d['columns']
+        ], dtype)
+    return data, next(iter(data_names or sets))
+
+
+dsp.add_data('sets_mapping', None, sh.inf(1, 0))
+
+
+def _parquet_columns(schema):
+    import json
+    meta = (schema.metadata or {}).get(b'syncing')
+    if meta is None:
+        return dict(zip(schema.names, schema.names))
+    keys = json.loads(meta)['columns']
+    return {
+        tuple(k) if isinstance(k, list) else k: n
+        for k, n in zip(keys, schema.names)
+    }
+
+
+@sh.add_function(dsp, outputs=['raw_data', 'reference_name'],
+                 inputs_kwargs=True, input_domain=file_ext('parquet'))
+def read_parquet(input_fpath, data_names=None, sets_mapping=None,
+                 dtype='float64'):
+    """
+    Reads the Parquet file or directory, loading only the needed columns.
+
+    A directory (`.parquet`) contains a `.parquet` file for each data-set (the
+    file name is the data-set name), while a single file is one data-set.
+    Data-sets are filtered by `data_names` before opening the files. If
+    `sets_mapping` is given, only the mapped data-sets and columns are read.
+
+    :param input_fpath:
+        Input file or directory path.
+    :type input_fpath: str
+
+    :param data_names:
+        Data names to filter out the data sets to synchronise.
+    :type data_names: list
+
+    :param sets_mapping:
+        Mapping of data-sets to _process.
+
+        It is like `{"<set-name>": {"<new-name>": "<old-name>", ...}, ...}`.
+    :type sets_mapping: dict[str, dict[str, str]]
+
+    :param dtype:
+        Float type of the data-sets ('float64' or 'float32').
+    :type dtype: str
+
+    :return:
+        Raw data-sets and reference data-set name.
+    :rtype: dict[str, syncing.model.dataset.DataSet | dict], str
+    """
+    import glob
+    import numpy as np
+    import os.path as osp
+    import pyarrow.parquet as pq
+    from syncing.model.dataset import DataSet
+    if osp.isdir(input_fpath):
+        fpaths = sorted(glob.glob(osp.join(input_fpath, '*.parquet')))
+    else:
+        fpaths = [input_fpath]
+    fpaths = {osp.splitext(osp.basename(f))[0]: f for f in fpaths}
+    names, data = list(data_names or fpaths), {}
+    for name in names:
+        if sets_mapping is not None and name not in sets_mapping:
+            continue
+        fpath = fpaths[name]
+        columns = _parquet_columns(pq.read_schema(fpath))
+        if sets_mapping is not None:
+            keys = dict.fromkeys(sets_mapping[name].values())
+            columns = {k: columns[k] for k in keys}
+        table = pq.read_table(fpath, columns=list(columns.values()))
+        if not table.num_rows:
+            continue
+        arrays = [table.column(k).to_numpy() for k in columns.values()]
+        try:
+            values = np.empty(
+                (table.num_rows, len(arrays)), dtype=dtype, order='F'
+            )
+            for i, v in enumerate(arrays):
+                values[:, i] = v
+            data[name] = DataSet(values, columns)
+        except (ValueError, TypeError):  # Not numeric.
+            data[name] = dict(zip(columns, arrays))
+    return data, names[0]
+
+
+def _csv_fpaths(input_fpath):
+    import glob
+    import os.path as osp
+    if osp.isdir(input_fpath):
+        fpaths = glob.glob(osp.join(input_fpath, '*.csv'))
+    elif glob.has_magic(input_fpath):
+        fpaths = glob.glob(input_fpath)
+    else:
+        fpaths = [input_fpath]
+    return {osp.splitext(osp.basename(f))[0]: f for f in sorted(fpaths)}
+
+
+def _csv_domain(input_fpath, *args):
+    import os.path as osp
+    if osp.isdir(input_fpath):
+        return bool(_csv_fpaths(input_fpath))
+    return file_ext('csv')(input_fpath)
+
+
+@sh.add_function(dsp, outputs=['raw_data', 'reference_name'],
+                 inputs_kwargs=True, input_domain=_csv_domain)
+def read_csv(input_fpath, header=0, data_names=None, sets_mapping=None,
+             dtype='float64'):
+    """
+    Reads a directory (or a glob pattern) of CSV files.
+
+    Each file is a data-set (the file name is the data-set name). The files
+    are parsed concurrently with the `pandas` C parser in a thread pool.
+    If `sets_mapping` is given, only the mapped files and columns are read.
+
+    :param input_fpath:
+        Input directory, glob pattern (e.g., `logs/*.csv`), or file path.
+    :type input_fpath: str
+
+    :param header:
+        Row (0-indexed) to use for the column labels.
+    :type header: int | list[int]
+
+    :param data_names:
+        Data names to filter out the data sets to synchronise.
+    :type data_names: list
+
+    :param sets_mapping:
+        Mapping of data-sets to _process.
+
+        It is like `{"<set-name>": {"<new-name>": "<old-name>", ...}, ...}`.
+    :type sets_mapping: dict[str, dict[str, str]]
+
+    :param dtype:
+        Float type of the data-sets ('float64' or 'float32').
+    :type dtype: str
+
+    :return:
+        Raw data-sets and reference data-set name.
+    :rtype: dict[str, syncing.model.dataset.DataSet | dict], str
+    """
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    from syncing.model.dataset import DataSet
+    fpaths = _csv_fpaths(input_fpath)
+    if not fpaths:
+        raise ValueError('No CSV files match %r.' % input_fpath)
+    names = list(data_names or fpaths)
+    if not isinstance(header, int):
+        header = list(header)
+
+    def parse(item):
+        name, usecols = item
+        return name, pd.read_csv(
+            fpaths[name], header=header, usecols=usecols, engine='c'
+        )
+
     data = {}
-    with open(input_fpath) as file:
-        for k, v in sh.stack_nested_keys(json.load(file)):
-            if not data_names or k[0] in data_names:
-                sh.get_nested_dicts(data, k[0])[sh.bypass(*k[1:])] = np.array(v)
-        return data
+    with ThreadPoolExecutor() as executor:
+        for name, df in executor.map(parse, _excel_columns(
+                names, header, sets_mapping)):
+            if df.empty:
+                continue
+            try:
+                data[name] = DataSet(df.to_numpy(dtype), df.columns)
+            except (ValueError, TypeError):  # Not numeric.
+                data[name] = {k: v.values for k, v in df.items()}
+    return data, names[0]
@@ -31,15 +31,16 @@ def save_excel_template(template_fpath):
     with pd.ExcelWriter(template_fpath, engine='openpyxl') as writer:
         pd.DataFrame(
             {'x': [], 'y': []}, index=[]
-        ).to_excel(writer, 'ref', index=False)
+        ).to_excel(writer, sheet_name='ref', index=False)
         pd.DataFrame(
             {'x': [], 'y': [], 'data-1': [], 'data-2': []}, index=[]
-        ).to_excel(writer, 'data', index=False)
+        ).to_excel(writer, sheet_name='data', index=False)
     return template_fpath
 
 
-@sh.add_function(dsp, input_domain=file_ext('xlsx'), outputs=['written'])
-def save_excel(output_fpath, outputs):
+@sh.add_function(dsp, input_domain=file_ext('xlsx'), outputs=['written'],
+                 inputs_kwargs=True, inputs_defaults=True)
+def save_excel(output_fpath, outputs, excel_engine='stream'):
     """
     Save dsp outputs in an Excel file.
 
@@ -51,37 +52,242 @@ def save_excel(output_fpath, outputs):
         Model outputs.
     :type outputs: dict
 
+    :param excel_engine:
+        Engine to write the sheets:
+
+            + 'stream': the rows are streamed from the arrays into a write-only
+              workbook (constant memory, no intermediate DataFrames).
+            + 'pandas': the sheets are written from DataFrames with
+              :meth:`pandas.DataFrame.to_excel`.
+    :type excel_engine: str
+
     :return:
         File path where output are written.
     :rtype: str
     """
-    import pandas as pd
     os.makedirs(osp.dirname(output_fpath) or '.', exist_ok=True)
+    sheets = {}
+    if 'shifts' in outputs:
+        sheets['shifts'] = outputs['shifts']
+    if 'resampled' in outputs:
+        sheets['synced'] = outputs['resampled']
+    for name, data in outputs.get('data', {}).items():
+        sheets['origin.%s' % name] = data
+
+    if excel_engine == 'stream':
+        return _stream_excel(output_fpath, sheets)
+
+    import pandas as pd
     with pd.ExcelWriter(output_fpath, engine='openpyxl') as writer:
-        if 'shifts' in outputs:
-            pd.DataFrame(outputs['shifts'], index=[0]).T.to_excel(
-                writer, 'shifts', header=False
+        for sheet_name, data in sheets.items():
+            if sheet_name == 'shifts':
+                pd.DataFrame(data, index=[0]).T.to_excel(
+                    writer, sheet_name=sheet_name, header=False
+                )
+            else:
+                _dataframe(data).to_excel(writer, sheet_name=sheet_name)
+    return output_fpath
+
+
+def _header_cell(ws):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    # Same style of the `pandas` header and index cells.
+    cell, side = WriteOnlyCell(ws), Side(style='thin')
+    cell.font = Font(bold=True)
+    cell.border = Border(left=side, right=side, top=side, bottom=side)
+    cell.alignment = Alignment(horizontal='center', vertical='top')
+    return cell
+
+
+def _styled(cell, value):
+    import copy
+    cell = copy.copy(cell)
+    cell.value = value
+    return cell
+
+
+def _flat_columns(data):
+    # Returns the columns keys, the arrays/blocks, and if the keys are tuples
+    # (i.e., `pandas.MultiIndex` columns).
+    from syncing.model.dataset import DataSet
+    if isinstance(data, DataSet):
+        multi = all(isinstance(k, tuple) for k in data.columns)
+        return [sh.stlp(k) for k in data.columns], [data.values], multi
+    keys, parts = [], []
+    for k, v in data.items():
+        if isinstance(v, DataSet):
+            keys.extend((k,) + sh.stlp(c) for c in v.columns)
+            parts.append(v.values)
+        else:
+            for j, u in sh.stack_nested_keys(v):
+                keys.append((k,) + j)
+                parts.append(u)
+    return keys, parts, True
+
+
+def _write_header(ws, keys, multi):
+    from openpyxl.utils import get_column_letter
+    cell, depth = _header_cell(ws), max(map(len, keys))
+    keys = [k + (None,) * (depth - len(k)) for k in keys]
+    for level in range(depth):
+        row, start = [None], 0
+        for j, k in enumerate(keys, 1):
+            if j < len(keys) and level < depth - 1 and \
+                    keys[j][:level + 1] == k[:level + 1]:
+                continue
+            row.append(_styled(cell, k[level]))
+            row.extend([None] * (j - start - 1))
+            if j - start > 1:
+                ws.merged_cells.add('%s%d:%s%d' % (
+                    get_column_letter(start + 2), level + 1,
+                    get_column_letter(j + 1), level + 1
+                ))
+            start = j
+        ws.append(row)
+    if multi:
+        ws.append([])  # Row of the index names.
+
+
+def _stream_rows(ws, parts, chunk_size=4096):
+    import numpy as np
+    index = _header_cell(ws)
+    n = len(parts[0]) if parts else 0
+    for start in range(0, n, chunk_size):
+        block = np.column_stack([v[start:start + chunk_size] for v in parts])
+        if block.dtype.kind == 'f' and not np.isfinite(block).all():
+            values = block.astype(object)
+            values[np.isnan(block)] = None  # As `na_rep=''`.
+            values[np.isinf(block)] = np.where(
+                block[np.isinf(block)] > 0, 'inf', '-inf'
             )
-        if 'resampled' in outputs:
-            data = dict(sh.stack_nested_keys(outputs['resampled']))
-            pd.DataFrame(data).to_excel(writer, 'synced')
+            block = values
+        for i, row in enumerate(block.tolist(), start):
+            # The row is written on append, hence the cell can be reused.
+            index.value = i
+            row.insert(0, index)
+            ws.append(row)
+
 
-        for name, data in outputs.get('data', {}).items():
-            pd.DataFrame(data).to_excel(writer, 'origin.%s' % name)
+def _stream_excel(output_fpath, sheets):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for sheet_name, data in sheets.items():
+        ws = wb.create_sheet(sheet_name)
+        if sheet_name == 'shifts':
+            cell = _header_cell(ws)
+            for k, v in data.items():
+                ws.append([_styled(cell, k), v])
+            continue
+        keys, parts, multi = _flat_columns(data)
+        if keys:
+            _write_header(ws, keys, multi)
+            _stream_rows(ws, parts)
+    wb.save(output_fpath)
     return output_fpath
 
 
+def _columns(keys):
+    import pandas as pd
+    if keys and all(isinstance(k, tuple) for k in keys):
+        return pd.MultiIndex.from_tuples(keys)
+    return keys
+
+
+def _dataframe(data):
+    import numpy as np
+    import pandas as pd
+    from syncing.model.dataset import DataSet
+    if isinstance(data, DataSet):
+        return pd.DataFrame(data.values, columns=_columns(data.columns))
+    sets = data.values()
+    if sets and all(isinstance(v, DataSet) for v in sets) and len({
+        len(v.values) for v in sets
+    }) == 1:
+        return pd.DataFrame(np.hstack([v.values for v in sets]), columns=(
+            _columns([(k, c) for k, v in data.items() for c in v.columns])
+        ))
+    return pd.DataFrame(dict(sh.stack_nested_keys(data)))
+
+
 def _json_default(o):
     import numpy as np
     if isinstance(o, np.ndarray):
         return o.tolist()
 
 
-@sh.add_function(dsp, input_domain=file_ext('json'), outputs=['written'])
-def save_json(output_fpath, outputs):
+_JSON_CONSTANTS = {float('inf'): 'Infinity', float('-inf'): '-Infinity'}
+
+
+def _json_array(file, a, fmt, separators, chunk_size=65536):
+    # Writes a 1-D numeric array in chunks, formatting each chunk at once.
+    import json
+    import numpy as np
+    if a.ndim != 1 or a.dtype.kind not in 'fiu':
+        json.dump(a.tolist(), file, separators=separators)
+        return
+    sep = separators[0]
+    fmt = '%d' if a.dtype.kind in 'iu' else fmt
+    # Single precision floats are written with their own shortest repr.
+    single = fmt == '%r' and a.dtype == np.float32
+    file.write('[')
+    for start in range(0, len(a), chunk_size):
+        chunk = a[start:start + chunk_size]
+        if start:
+            file.write(sep)
+        if single:
+            text = chunk.astype(str).tolist()
+            for i in np.flatnonzero(~np.isfinite(chunk)).tolist():
+                text[i] = _JSON_CONSTANTS.get(float(chunk[i]), 'NaN')
+            file.write(sep.join(text))
+        elif chunk.dtype.kind == 'f' and not np.isfinite(chunk).all():
+            file.write(sep.join(
+                fmt % v if np.isfinite(v) else _JSON_CONSTANTS.get(v, 'NaN')
+                for v in chunk.tolist()
+            ))
+        else:
+            file.write(sep.join([fmt] * len(chunk)) % tuple(chunk.tolist()))
+    file.write(']')
+
+
+def _json_key(key):
+    import json
+    if isinstance(key, str):
+        return json.dumps(key)
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(json.dumps(key))
+    raise TypeError('keys must be str, int, float, bool or None, not %s' % (
+        key.__class__.__name__
+    ))
+
+
+def _json_stream(file, obj, fmt, separators):
+    import json
+    import numpy as np
+    if isinstance(obj, dict):
+        file.write('{')
+        for i, (k, v) in enumerate(obj.items()):
+            if i:
+                file.write(separators[0])
+            file.write(_json_key(k))
+            file.write(separators[1])
+            _json_stream(file, v, fmt, separators)
+        file.write('}')
+    elif isinstance(obj, np.ndarray):
+        _json_array(file, obj, fmt, separators)
+    else:
+        json.dump(obj, file, separators=separators, default=_json_default)
+
+
+@sh.add_function(dsp, input_domain=file_ext('json'), outputs=['written'],
+                 inputs_kwargs=True, inputs_defaults=True)
+def save_json(output_fpath, outputs, json_precision=None, json_compact=False):
     """
     Save dsp outputs in an JSON file.
 
+    The arrays are streamed to the file in chunks, without converting them
+    into lists of Python floats.
+
     :param output_fpath:
         Output file path.
     :type output_fpath: str
@@ -90,15 +296,155 @@ def save_json(output_fpath, outputs):
         Model outputs.
     :type outputs: dict
 
+    :param json_precision:
+        Number of significant digits of the written floats. If None, the
+        shortest representation that round-trips exactly is used.
+    :type json_precision: int
+
+    :param json_compact:
+        Write the JSON without spaces after the separators?
+    :type json_compact: bool
+
     :return:
         File path where output are written.
     :rtype: str
     """
-    import json
     os.makedirs(osp.dirname(output_fpath) or '.', exist_ok=True)
+    fmt = '%r' if json_precision is None else '%.{}g'.format(json_precision)
+    separators = (',', ':') if json_compact else (', ', ': ')
     with open(output_fpath, 'w') as file:
-        json.dump(
-            sh.selector(('shifts', 'resampled'), outputs, allow_miss=True),
-            file, default=_json_default
+        _json_stream(file, sh.selector(
+            ('shifts', 'resampled'), outputs, allow_miss=True
+        ), fmt, separators)
+    return output_fpath
+
+
+@sh.add_function(dsp, input_domain=file_ext('npy'), outputs=['written'])
+def save_npy(output_fpath, outputs):
+    """
+    Save dsp outputs in a NumPy directory.
+
+    The directory (`.npy`) contains a `manifest.json` (with the shifts) and a
+    `.npy` file for each re-sampled data-set, i.e. a Fortran-ordered 2-D block
+    with a column for each variable (single precision if all variables are).
+    The arrays are streamed column by column straight to disk.
+
+    :param output_fpath:
+        Output directory path.
+    :type output_fpath: str
+
+    :param outputs:
+        Model outputs.
+    :type outputs: dict
+
+    :return:
+        Directory path where output are written.
+    :rtype: str
+    """
+    import json
+    import numpy as np
+    from numpy.lib.format import open_memmap
+    from syncing.model.dataset import float_dtype
+    os.makedirs(output_fpath, exist_ok=True)
+    manifest = {'shifts': outputs.get('shifts', {}), 'data': []}
+    for i, (name, data) in enumerate(outputs.get('resampled', {}).items()):
+        data = dict(sh.stack_nested_keys(data))
+        columns, fname = [sh.bypass(*k) for k in data], '%d.npy' % i
+        if not columns:
+            continue
+        block = open_memmap(
+            osp.join(output_fpath, fname), mode='w+', dtype=float_dtype(
+                np.result_type(*data.values())
+            ),
+            shape=(len(next(iter(data.values()), ())), len(columns)),
+            fortran_order=True
+        )
+        for j, v in enumerate(data.values()):
+            block[:, j] = v
+        block.flush()
+        del block
+        manifest['data'].append(
+            {'name': name, 'file': fname, 'columns': columns}
+        )
+    with open(osp.join(output_fpath, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file)
+    return output_fpath
+
+
+@sh.add_function(dsp, input_domain=file_ext('parquet'), outputs=['written'])
+def save_parquet(output_fpath, outputs):
+    """
+    Save dsp outputs in a Parquet directory.
+
+    The directory (`.parquet`) contains a `.parquet` file for each re-sampled
+    data-set (the file name is the data-set name). The variables names and the
+    data-set shift are stored in the file metadata (key `syncing`).
+
+    :param output_fpath:
+        Output directory path.
+    :type output_fpath: str
+
+    :param outputs:
+        Model outputs.
+    :type outputs: dict
+
+    :return:
+        Directory path where output are written.
+    :rtype: str
+    """
+    import json
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    os.makedirs(output_fpath, exist_ok=True)
+    shifts = outputs.get('shifts', {})
+    for name, data in outputs.get('resampled', {}).items():
+        data = dict(sh.stack_nested_keys(data))
+        meta = {'columns': [sh.bypass(*k) for k in data]}
+        if name in shifts:
+            meta['shift'] = shifts[name]
+        table = pa.table(
+            [pa.array(np.asarray(v)) for v in data.values()],
+            names=['/'.join(map(str, k)) for k in data],
+            metadata={'syncing': json.dumps(meta)}
         )
+        pq.write_table(table, osp.join(output_fpath, '%s.parquet' % name))
+    return output_fpath
+
+
+@sh.add_function(dsp, input_domain=file_ext('csv'), outputs=['written'])
+def save_csv(output_fpath, outputs):
+    """
+    Save dsp outputs in a CSV directory.
+
+    The directory (`.csv`) contains the `shifts.csv` and `synced.csv` files,
+    written concurrently in a thread pool.
+
+    :param output_fpath:
+        Output directory path.
+    :type output_fpath: str
+
+    :param outputs:
+        Model outputs.
+    :type outputs: dict
+
+    :return:
+        Directory path where output are written.
+    :rtype: str
+    """
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    os.makedirs(output_fpath, exist_ok=True)
+    dfs = {}
+    if 'shifts' in outputs:
+        dfs['shifts'] = pd.DataFrame(outputs['shifts'], index=[0]).T, False
+    if 'resampled' in outputs:
+        dfs['synced'] = _dataframe(outputs['resampled']), True
+
+    def write(item):
+        name, (df, header) = item
+        df.to_csv(osp.join(output_fpath, '%s.csv' % name), header=header)
+
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(write, dfs.items()))
     return output_fpath
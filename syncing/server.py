@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+"""
+It contains a long-running local HTTP server that synchronises data-sets with
+a pool of warm workers.
+
+Endpoints:
+
+    + `POST /sync`: runs a job. The body is a JSON object with the parameters
+      of `syncing sync` (e.g., `{"input_fpath": "data.xlsx", "output_fpath":
+      "out.json", "y_label": "y1", "interpolation_method": "cubic"}`). If
+      `output_fpath` is given the response is `{"written": "<output-file>"}`,
+      otherwise it contains the `shifts` and the `resampled` data-sets.
+    + `GET /health`: returns the number of workers and of running jobs.
+
+When all workers are busy and the queue is full, the server answers `503`
+with a `Retry-After` header (backpressure). If a worker dies (e.g., out of
+memory), the workers are restarted and the jobs running on them are answered
+with `503` too.
+"""
+import json
+import socket
+import logging
+import threading
+import socketserver
+import http.server as hs
+
+log = logging.getLogger(__name__)
+
+#: Parameters of a job (i.e., the inputs of `syncing sync`).
+INPUTS = (
+    'input_fpath', 'output_fpath', 'data_names', 'reference_name', 'x_label',
+    'y_label', 'interpolation_method', 'sets_mapping_fpath', 'labels_fpath',
+    'methods_fpath', 'no_sync', 'shift_search', 'max_shift', 'jobs',
+    'executor', 'chunk_size', 'cache_dir', 'cache_size', 'header',
+    'excel_engine', 'excel_cache', 'excel_cache_dir', 'json_precision',
+    'json_compact', 'dtype'
+)
+
+
+def run_job(inputs):
+    """
+    Runs a job in a worker.
+
+    :param inputs:
+        Inputs of the processing model.
+    :type inputs: dict
+
+    :return:
+        Written file path (`{"written": path}`) or model outputs.
+    :rtype: dict
+    """
+    import schedula as sh
+    from syncing import batch
+    inputs = batch.read_inputs(inputs)
+    if 'output_fpath' in inputs:
+        return {'written': batch.write_outputs(inputs)}
+    outputs = batch._model().dispatch(inputs, ['outputs'])['outputs']
+    return sh.selector(('shifts', 'resampled'), outputs, allow_miss=True)
+
+
+def parse_inputs(body):
+    """
+    Parses the parameters of a job.
+
+    :param body:
+        JSON object with the parameters of `syncing sync`.
+    :type body: bytes
+
+    :return:
+        Inputs of the processing model.
+    :rtype: dict
+    """
+    import schedula as sh
+    inputs = json.loads(body or b'{}')
+    if not isinstance(inputs, dict):
+        raise ValueError('The request body must be a JSON object.')
+    unknown = set(inputs) - set(INPUTS)
+    if unknown:
+        raise ValueError('Unknown parameters %s.' % sorted(unknown))
+    if 'input_fpath' not in inputs:
+        raise ValueError('Missing parameter `input_fpath`.')
+    for k in ('x_label', 'y_label', 'header'):
+        if isinstance(inputs.get(k), list):
+            inputs[k] = sh.bypass(*inputs[k])
+    return {k: v for k, v in inputs.items() if v is not None}
+
+
+class _Handler(hs.BaseHTTPRequestHandler):
+    def address_string(self):
+        return str(self.client_address or 'unix')
+
+    def log_message(self, format, *args):
+        log.info(format, *args)
+
+    def _send(self, code, body=None, **headers):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        for k, v in headers.items():
+            self.send_header(k.replace('_', '-'), str(v))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(json.dumps(body).encode())
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._send(404, {'error': 'Not found.'})
+        self._send(200, {
+            'status': 'ok', 'workers': self.server.workers,
+            'running': self.server.running
+        })
+
+    def do_POST(self):
+        if self.path != '/sync':
+            return self._send(404, {'error': 'Not found.'})
+        try:
+            inputs = parse_inputs(self.rfile.read(
+                int(self.headers.get('Content-Length') or 0)
+            ))
+        except ValueError as ex:
+            return self._send(400, {'error': str(ex)})
+        if not self.server.slots.acquire(blocking=False):
+            return self._send(503, {'error': 'Server busy.'}, Retry_After=1)
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            with self.server.lock:
+                self.server.running += 1
+                pool = self.server.pool
+            res = pool.submit(run_job, inputs).result()
+        except BrokenProcessPool:  # A worker died (e.g., out of memory).
+            self.server.restart_pool(pool)
+            return self._send(503, {
+                'error': 'Worker crashed, the workers were restarted.'
+            }, Retry_After=1)
+        except Exception as ex:
+            ex = getattr(ex, 'ex', None) or ex  # Cause of `DispatcherError`.
+            return self._send(422, {
+                'error': '%s: %s' % (type(ex).__name__, ex)
+            })
+        finally:
+            with self.server.lock:
+                self.server.running -= 1
+            self.server.slots.release()
+        if 'written' in res:
+            return self._send(200, res)
+        import io
+        from syncing.rw.write import _json_stream
+        precision = inputs.get('json_precision')
+        fmt = '%r' if precision is None else '%.{}g'.format(precision)
+        separators = (',', ':') if inputs.get('json_compact') else (', ', ': ')
+        self._send(200)  # Streamed without `Content-Length` (HTTP/1.0).
+        f = io.TextIOWrapper(self.wfile, write_through=True)
+        try:
+            _json_stream(f, res, fmt, separators)
+        finally:
+            f.detach()
+
+
+class SyncServer(hs.ThreadingHTTPServer):
+    """
+    Local HTTP server that synchronises data-sets with a pool of warm workers.
+
+    The workers import the modules and build the processing model when the
+    server starts, then they are reused by all jobs.
+
+    :param address:
+        Server address, `(host, port)` or a Unix socket path (an existing
+        socket is replaced, any other file is an error).
+    :type address: tuple[str, int] | str
+
+    :param workers:
+        Number of worker processes. If 0, it is the number of CPUs.
+    :type workers: int
+
+    :param queue_size:
+        Number of jobs waiting for a worker, beyond which the requests are
+        rejected with `503`. If None, it is the number of workers.
+    :type queue_size: int
+    """
+    daemon_threads = True
+
+    def __init__(self, address, workers=0, queue_size=None):
+        import os
+        self._unix_path = None
+        if isinstance(address, str):
+            import stat
+            if os.path.exists(address):  # Stale socket of a previous server.
+                if not stat.S_ISSOCK(os.stat(address).st_mode):
+                    raise FileExistsError(
+                        'Cannot bind %r, it exists and it is not a socket.' %
+                        address
+                    )
+                os.remove(address)
+            self.address_family, self._unix_path = socket.AF_UNIX, address
+        super(SyncServer, self).__init__(address, _Handler)
+        self.workers = workers or os.cpu_count() or 1
+        if queue_size is None:
+            queue_size = self.workers
+        self.slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self.lock, self.running = threading.Lock(), 0
+        self.pool = self._start_pool()
+
+    def _start_pool(self):
+        from concurrent.futures import ProcessPoolExecutor, wait
+        from syncing import batch
+        pool = ProcessPoolExecutor(self.workers, initializer=batch.warm_up)
+        wait([pool.submit(batch.warm_up) for _ in range(self.workers)])
+        return pool
+
+    def restart_pool(self, pool):
+        """
+        Replaces a broken pool of workers with a new warm one.
+
+        :param pool:
+            Broken pool. If it was already replaced, nothing is done.
+        :type pool: concurrent.futures.ProcessPoolExecutor
+        """
+        with self.lock:  # New jobs wait for the warm workers.
+            if self.pool is not pool:
+                return
+            log.warning('A worker crashed, restarting the workers.')
+            self.pool = self._start_pool()
+        pool.shutdown(wait=False)
+
+    def server_bind(self):
+        if self._unix_path is None:
+            return super(SyncServer, self).server_bind()
+        # `HTTPServer.server_bind` expects a `(host, port)` address.
+        socketserver.TCPServer.server_bind(self)
+        self.server_name, self.server_port = self._unix_path, 0
+
+    def server_close(self):
+        super(SyncServer, self).server_close()
+        self.pool.shutdown()
+        if self._unix_path is not None:
+            import os
+            if os.path.exists(self._unix_path):
+                os.remove(self._unix_path)
@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2019-2023 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+import unittest
+import numpy as np
+from syncing.model import interp
+
+
+class TestInterp(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.xp = np.sort(rng.uniform(0, 100, 300))
+        self.fp = rng.normal(size=(300, 3))
+        self.x = np.sort(rng.uniform(-5, 105, 500))
+
+    @staticmethod
+    def _dense_integral(x, xp, fp):
+        dx = np.zeros(len(x) + 1)
+        dx[1:-1] = np.diff(x) / 8.0
+        a = np.diag((dx[:-1] + dx[1:]) * 3.0)
+        a += np.diag(dx[1:-1], 1) + np.diag(dx[1:-1], -1)
+        X = np.concatenate(([x[0]], (x[:-1] + x[1:]) / 2, [x[-1]]))
+        return np.linalg.solve(a, np.diff(interp._cum_integral(X, xp, fp)))
+
+    def test_integral_interpolation(self):
+        x, xp, fp = self.x, self.xp, self.fp
+        res = interp.integral_interpolation(x, xp, fp)
+        self.assertEqual(res.shape, (len(x), fp.shape[1]))
+
+        # Dense reference solution.
+        for i, v in enumerate(fp.T):
+            np.testing.assert_allclose(
+                res[:, i], self._dense_integral(x, xp, v)
+            )
+            np.testing.assert_allclose(
+                interp.integral_interpolation(x, xp, v), res[:, i]
+            )
+
+    def test_integral_interpolation_irregular(self):
+        xp, v = self.xp, self.fp[:, 0]
+        repeated = np.repeat(self.x[:100], 2)[1:-1]
+        unsorted = np.array([1, 1.1, 0, 4, 5, 7])  # Not positive definite.
+        for x in (repeated, unsorted):
+            np.testing.assert_allclose(
+                interp.integral_interpolation(x, xp, v),
+                self._dense_integral(x, xp, v)
+            )
+        with self.assertRaises(ValueError):
+            interp.integral_interpolation(np.repeat(self.x, 2), xp, v)
+
+    def test_linear_interpolation(self):
+        x = np.concatenate((self.x, [self.xp[0], self.xp[-1], np.inf]))
+        for xp in (self.xp, np.repeat(self.xp, 2)):
+            fp = np.random.default_rng(1).normal(size=(len(xp), 3))
+            res = interp.linear_interpolation(x, xp, np.asfortranarray(fp))
+            self.assertEqual(res.shape, (len(x), 3))
+            for i, v in enumerate(fp.T):  # With the edges outside.
+                np.testing.assert_allclose(res[:, i], np.interp(x, xp, v))
+                np.testing.assert_allclose(
+                    interp.linear_interpolation(x, xp, v), res[:, i]
+                )
+
+
+class TestXCorr(unittest.TestCase):
+    def test_correlator(self):
+        from syncing.model import xcorr
+        rng = np.random.default_rng(0)
+        for n in (7, 100, 1009, 4096):
+            a, z = rng.normal(size=n), rng.normal(size=n)
+            lo, hi = xcorr.full_lags(n)
+            res = [a.dot(np.roll(z, -k)) for k in range(lo, hi + 1)]
+            corr = xcorr.Correlator(a)
+            self.assertEqual(corr.direct, n * n <= xcorr.DIRECT_MAX_OPS)
+            np.testing.assert_allclose(corr(z), res, atol=1e-9)
+
+            # Previous complex FFT formulation.
+            c = np.fft.fftshift(np.real(np.fft.ifft(
+                np.fft.fft(a) * np.fft.fft(np.flipud(z))
+            )))
+            self.assertEqual(corr.lag(z), n // 2 - 1 - np.argmax(c))
+
+            lags = lo // 3, hi // 4
+            np.testing.assert_allclose(
+                xcorr.Correlator(a, lags)(z),
+                res[lags[0] - lo:lags[1] - lo + 1],
+                atol=1e-9
+            )
+
+    def test_pyramid_lags(self):
+        from syncing.model import _compute_shifts, xcorr
+        rng = np.random.default_rng(3)
+        t = np.arange(0, 600, .1)
+        v = np.cumsum(rng.normal(size=len(t)))
+        v = np.convolve(v, np.ones(50), 'same')
+        data = (t + 3.37, v + rng.normal(0, .5, len(t))), (t[::10] - 12.1,
+                                                          v[::10])
+        res = list(_compute_shifts((t, v), *data))
+        self.assertEqual(
+            res, list(_compute_shifts((t, v), *data, search='pyramid'))
+        )
+        dx = float(np.median(np.diff(t)) / 10)
+        l, h = min(t[0], data[1][0][0]), max(t[-1], data[0][0][-1])
+        n = int(np.ceil((h + dx - l) / dx))
+        for size in (2 ** 10, 2 ** 12):
+            lags = xcorr.pyramid_lags(
+                (t, v), data, l, dx, n, size=size, block=2 ** 12
+            )
+            np.testing.assert_allclose(np.multiply(lags, dx), res, atol=dx)
+
+    def test_bounded_lags(self):
+        from syncing.model import xcorr
+        rng = np.random.default_rng(4)
+        t = np.arange(0, 300, .1)
+        v = np.convolve(rng.normal(size=len(t)), np.ones(20), 'same')
+        data = [(t + 2.5, v), (t - .73, v + rng.normal(0, .1, len(t)))]
+        n, dx = len(t) + 100, .1
+        x = t[0] - 5 + np.arange(n) * dx
+        corr = xcorr.Correlator(np.interp(x, t, v))
+        for lags in ((-40, 40), (-10, 3), (5, 5000)):
+            lags = max(lags[0], corr.lags[0]), min(lags[1], corr.lags[1])
+            i, j = lags[0] - corr.lags[0], lags[1] - corr.lags[0] + 1
+            res = [
+                xcorr.argmax_lag(corr(np.interp(x, *d))[i:j], lags)
+                for d in data
+            ]
+            for func in (xcorr.search_lags, xcorr.pyramid_lags):
+                self.assertEqual(
+                    func((t, v), data, x[0], dx, n, lags, block=256), res
+                )
+
+    def test_parallel_shifts(self):
+        from syncing.model import _compute_shifts
+        rng = np.random.default_rng(5)
+        t = np.arange(0, 300, .1)
+        v = np.convolve(rng.normal(size=len(t)), np.ones(20), 'same')
+        data = [(t + rng.uniform(-5, 5), v) for _ in range(5)]
+        res = list(_compute_shifts((t, v), *data))
+        for kw in ({'executor': 'thread'}, {'executor': 'process'},
+                   {'executor': 'process', 'search': 'pyramid'}):
+            self.assertEqual(
+                res, list(_compute_shifts((t, v), *data, jobs=3, **kw))
+            )
+
+    def test_worker_shared_memory(self):
+        from unittest import mock
+        from multiprocessing import shared_memory, resource_tracker
+        from syncing.model import xcorr
+        ref = np.ones((2, 10))
+        shm = shared_memory.SharedMemory(create=True, size=ref.nbytes)
+        try:
+            with mock.patch.object(resource_tracker, 'register') as register:
+                xcorr._init_worker(shm.name, ref.shape, ref.dtype.str, 0, 1,
+                                   10, None, 'full')
+            register.assert_not_called()  # The parent tracks it.
+            worker = xcorr._worker['shm']
+            xcorr._close_worker()
+            self.assertEqual({}, xcorr._worker)
+            self.assertIsNone(worker.buf)  # Closed.
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_single_precision_shifts(self):
+        # Documented accuracy of `dtype='float32'`: the shifts differ from the
+        # double precision ones by at most one grid step (i.e., a tenth of the
+        # median sampling step of the reference).
+        from syncing.process import synchronise
+        rng = np.random.default_rng(9)
+        for offset in (0, 1e5):
+            t = offset + np.cumsum(rng.uniform(.05, .15, 20000))
+            v = np.convolve(rng.normal(size=len(t)), np.ones(20), 'same')
+            data = {'ref': {'x': t, 'y': v}}
+            data.update({
+                'd%d' % i: {'x': t + rng.uniform(-5, 5), 'y': v}
+                for i in range(4)
+            })
+            dx = np.median(np.diff(t)) / 10
+            for search in ('full', 'pyramid'):
+                res = synchronise(data, shift_search=search)[0]
+                shifts, resampled = synchronise(
+                    data, shift_search=search, dtype='float32'
+                )
+                for k, s in res.items():
+                    self.assertLessEqual(abs(shifts[k] - s), dx, k)
+                for k, ds in resampled.items():
+                    self.assertEqual(ds.values.dtype, np.float32, k)
+        self.assertRaises(ValueError, synchronise, data, dtype='float16')
+
+
+class TestResample(unittest.TestCase):
+    def test_vectorised_methods(self):
+        rng = np.random.default_rng(6)
+        xp = np.cumsum(rng.uniform(.5, 1.5, 200))
+        fp = rng.normal(size=(200, 4))
+        x = np.linspace(xp[0] - 5, xp[-1] + 5, 300)
+        for k, method in interp.METHODS.items():
+            self.assertIn(method, interp.VECTORISED)
+            res = method(x, xp=xp, fp=fp)
+            self.assertEqual(res.shape, (len(x), fp.shape[1]), k)
+            for i, v in enumerate(fp.T):
+                np.testing.assert_allclose(
+                    res[:, i], method(x, xp=xp, fp=v), atol=1e-9, err_msg=k
+                )
+
+    def test_interpolate(self):
+        from syncing.model import _interpolate
+        rng = np.random.default_rng(7)
+        data = {'x': np.arange(50.), 'a': rng.normal(size=50),
+                'b': rng.normal(size=50), 'c': rng.normal(size=50)}
+        methods = dict.fromkeys(('a', 'c'), interp.METHODS['cubic'])
+        methods['b'] = lambda x, xp, fp: np.interp(x, xp, fp)
+        x = np.linspace(-1, 51, 70)
+        res = _interpolate(x, 'x', data, methods)
+        self.assertEqual(list(res), ['a', 'b', 'c'])
+        for k, v in res.items():
+            np.testing.assert_allclose(v, methods[k](x, xp=data['x'],
+                                                     fp=data[k]))
+
+
+class TestDataSet(unittest.TestCase):
+    def test_dataset(self):
+        import copy
+        import pickle
+        from syncing.model.dataset import DataSet, columnar
+        ds = columnar({'x': np.arange(4), 'y': [1., np.nan, 3, 4],
+                       'z': np.full(4, np.nan)})
+        self.assertIsInstance(ds, DataSet)
+        self.assertTrue(ds.values.flags.f_contiguous)
+        self.assertEqual(list(ds), ['x', 'y', 'z'])
+        self.assertTrue(np.shares_memory(ds['y'], ds.values))
+
+        self.assertEqual(ds.dropna().columns, ['x', 'y'])
+        sel = ds.select(['y', 'y'], ['a', 'b'])
+        np.testing.assert_equal(sel['a'], sel['b'])
+
+        for res in (pickle.loads(pickle.dumps(ds)), copy.deepcopy(ds)):
+            self.assertIsInstance(res, DataSet)
+            self.assertTrue(np.shares_memory(res['x'], res.values))
+
+        ds['x'] = np.ones(4)
+        np.testing.assert_equal(ds.values[:, 0], 1)
+        ds.update(w=np.zeros(4))
+        del ds['z']
+        self.assertEqual(ds.columns, ['x', 'y', 'w'])
+        self.assertEqual(ds.values.shape, (4, 3))
+        self.assertTrue(np.shares_memory(ds['w'], ds.values))
+        self.assertRaises(ValueError, ds.__setitem__, 'v', np.ones(3))
+
+        self.assertIsInstance(columnar({'a': [1], 'b': [1, 2]}), dict)
+        self.assertIsInstance(columnar({'a': ['a', 'b']}), dict)
+        self.assertEqual(
+            DataSet(np.ones((2, 2)), [('a', 'b'), ('a', 'c')]).nested().keys(),
+            {'a'}
+        )
+
+    def test_dropna_memory(self):
+        import tempfile
+        import tracemalloc
+        from syncing.model.dataset import DataSet
+        with tempfile.TemporaryFile() as file:
+            values = np.memmap(file, float, 'w+', shape=(20000, 50), order='F')
+            values[:, 1] = np.nan
+            values[0, 1] = 1
+            ds = DataSet(values, list(range(50)))
+            tracemalloc.start()
+            try:
+                res = ds.dropna()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertIs(res, ds)
+            self.assertLess(peak, values.nbytes / 10)
+
+    def test_dtype(self):
+        import pickle
+        from syncing.model import resample_data
+        from syncing.model.dataset import DataSet, columnar
+        x = np.arange(5, dtype=np.float32)
+        ds = columnar({'x': x, 'y': x * 2})
+        self.assertEqual(ds.values.dtype, np.float32)
+        self.assertEqual(columnar({'x': np.arange(5), 'y': x}).values.dtype,
+                         np.float64)
+        self.assertEqual(columnar({'x': np.arange(5)}, 'float32').values.dtype,
+                         np.float32)
+        self.assertEqual(DataSet(np.ones((2, 1), int), ['a']).values.dtype,
+                         np.float64)
+        ds['z'] = np.ones(5)
+        for res in (ds, ds.select(['z']), ds.copy(),
+                    pickle.loads(pickle.dumps(ds))):
+            self.assertEqual(res.values.dtype, np.float32)
+        data = {'ref': {'x': np.linspace(-1, 5, 20)}, 'data': ds}
+        labels = {k: {'x': 'x'} for k in data}
+        methods = {'data': dict.fromkeys(ds, interp.METHODS['linear'])}
+        methods['data']['z'] = interp.METHODS['cubic']
+        args = labels, 'ref', data, {'data': .5}, methods
+        for chunk_size in (None, 7):
+            res = resample_data(*args, chunk_size=chunk_size)['data']
+            self.assertEqual(res.values.dtype, np.float32)
+            np.testing.assert_allclose(res['y'], np.clip(
+                (data['ref']['x'] + .5) * 2, 0, 8
+            ), rtol=1e-6)
+
+    def test_resample_chunks(self):
+        from syncing.model import resample_data
+        from syncing.model.dataset import DataSet
+        rng = np.random.default_rng(8)
+        xp = np.cumsum(rng.uniform(.2, 1.8, 3000))
+        keys = list(interp.METHODS)
+        data = {
+            'ref': {'x': np.linspace(xp[0] - 10, xp[-1] + 10, 4000)},
+            'data': dict(zip(keys, rng.normal(size=(len(keys), len(xp)))),
+                         x=xp)
+        }
+        methods = {'data': interp.METHODS}
+        labels = {k: {'x': 'x'} for k in data}
+        args = labels, 'ref', data, {'data': 1.5}, methods
+        res = resample_data(*args)['data']
+        chunks = resample_data(*args, chunk_size=333)['data']
+        self.assertIsInstance(chunks, DataSet)
+        self.assertEqual(list(res), list(chunks))
+        for k in keys:
+            np.testing.assert_allclose(
+                chunks[k], res[k], atol=1e-9, rtol=1e-9, err_msg=k
+            )
+
+    def test_resample_chunks_unsorted(self):
+        from syncing.model import resample_data
+        rng = np.random.default_rng(9)
+        xp = np.cumsum(rng.uniform(.2, 1.8, 1000))
+        keys = ['linear', 'nearest', 'cubic']
+        fp = dict(zip(keys, rng.normal(size=(len(keys), len(xp)))), x=xp)
+        i = rng.permutation(len(xp))
+        data = {
+            'ref': {'x': np.linspace(xp[0] - 10, xp[-1] + 10, 1500)},
+            'sorted': fp, 'data': {k: v[i] for k, v in fp.items()}
+        }
+        methods = dict.fromkeys(('sorted', 'data'), interp.METHODS)
+        labels = {k: {'x': 'x'} for k in data}
+        args = labels, 'ref', data, {'sorted': 1.5, 'data': 1.5}, methods
+        res = resample_data(*args)['sorted']
+        chunks = resample_data(*args, chunk_size=111)['data']
+        for k in keys:
+            np.testing.assert_allclose(
+                chunks[k], res[k], atol=1e-9, rtol=1e-9, err_msg=k
+            )
@@ -9,7 +9,9 @@ import os
 import ddt
 import json
 import shutil
+import socket
 import unittest
+import multiprocessing
 import numpy as np
 import pandas as pd
 import os.path as osp
@@ -39,10 +41,16 @@ class TestCMD(unittest.TestCase):
         shutil.rmtree(cls.temp, ignore_errors=True)
         os.makedirs(cls.temp, exist_ok=True)
         os.chdir(cls.temp)
+        cls.cache_dir = os.environ.get('SYNCING_CACHE_DIR')
+        os.environ['SYNCING_CACHE_DIR'] = osp.join(cls.temp, 'cache')
 
     @classmethod
     def tearDownClass(cls):
         shutil.rmtree(cls.temp, ignore_errors=True)
+        if cls.cache_dir is None:
+            os.environ.pop('SYNCING_CACHE_DIR', None)
+        else:
+            os.environ['SYNCING_CACHE_DIR'] = cls.cache_dir
 
     @ddt.idata((
             ([], 2, 0),
@@ -64,6 +72,27 @@ class TestCMD(unittest.TestCase):
             ([files['xl'], 'sync4.json', '-y', 'y1', '-NS'], 0, 1),
             ([files['xl'], 'sync5.xlsx', 'Sheet2', 'Sheet1', '-y', 'y1'], 0, 1),
             ([files['xl'], 'sync5.json', 'Sheet2', 'Sheet1', '-y', 'y1'], 0, 1),
+            ([files['xl'], 'sync.json', '-y', 'y1', '--shift-search',
+              'pyramid'], 0, 1),
+            ([files['xl'], 'sync.json', '-y', 'y1', '--max-shift', 100], 0, 1),
+            ([files['xl'], 'none.json', '-y', 'y1', '--max-shift', -1], 2, 0),
+            ([files['xl'], 'sync2.json', '-I', 'cubic', '-M', files['methods'],
+              '-S', files['sets'], '-L', files['labels'], '-j', 0], 0, 1),
+            ([files['xl'], 'sync2.json', '-I', 'cubic', '-M', files['methods'],
+              '-S', files['sets'], '-L', files['labels'], '--chunk-size', 7],
+             0, 1),
+            ([files['xl_H'], 'sync3.json', '-H', 0, '-H', 1, '-x', 'x', '-x',
+              'x', '-y', 'y', '-y', 'y', '--excel-engine', 'pandas'], 0, 1),
+            ([files['xl_H'], 'sync3.xlsx', '-H', 0, '-H', 1, '-x', 'x', '-x',
+              'x', '-y', 'y', '-y', 'y', '--excel-engine', 'pandas'], 0, 1),
+            ([files['xl'], 'sync.json', '-y', 'y1', '--json-compact',
+              '--json-precision', 15], 0, 1),
+            ([files['xl'], 'sync2.json', '-I', 'cubic', '-M', files['methods'],
+              '-S', files['sets'], '-L', files['labels'], '--cache-dir',
+              'sync_cache'], 0, 1),
+            ([files['xl'], 'sync2.json', '-I', 'cubic', '-M', files['methods'],
+              '-S', files['sets'], '-L', files['labels'], '--cache-dir',
+              'sync_cache'], 0, 1),
     ))
     def test_sync(self, data):
         args, exit_code, file = data
@@ -83,6 +112,615 @@ class TestCMD(unittest.TestCase):
                         for k, v in sh.stack_nested_keys(json.load(r))
                     })
 
+    def test_sync_inputs(self):
+        from unittest import mock
+        with mock.patch.object(cli, '_process') as process:
+            args = [files['xl'], 'none.json', '-y', 'y1']
+            self.runner.invoke(cli.sync, args + ['--max-shift', 0])
+            self.runner.invoke(cli.sync, args + ['-NS', '--json-compact'])
+        default, flags = [c.args[0] for c in process.call_args_list]
+        self.assertEqual(default, {
+            'y_label': 'y1', 'max_shift': 0, 'input_fpath': files['xl'],
+            'output_fpath': 'none.json'
+        })
+        self.assertTrue(flags['no_sync'] and flags['json_compact'])
+
+    def test_npy(self):
+        from syncing.rw.read import read_excel, read_npy
+        from syncing.rw.write import save_npy
+        save_npy('data.npy', {'resampled': read_excel(files['xl'])[0]})
+        args = ['data.npy', 'sync_npy.npy', '-y', 'y1']
+        self.assertEqual(0, self.runner.invoke(cli.sync, args).exit_code)
+        with open(osp.join(results_dir, 'sync.json')) as f:
+            res = json.load(f)
+        with open(osp.join('sync_npy.npy', 'manifest.json')) as f:
+            self.assertEqual(res['shifts'], json.load(f)['shifts'])
+        data, ref = read_npy('sync_npy.npy')
+        self.assertEqual(ref, 'Sheet1')
+        self.assertIsInstance(data['Sheet2'].values.base, np.memmap)
+        self.assertEqual(
+            {k: np.round(v, 7).tolist()
+             for k, v in sh.stack_nested_keys(res['resampled'])},
+            {k: np.round(v, 7).tolist()
+             for k, v in sh.stack_nested_keys(data)}
+        )
+
+    def test_dtype(self):
+        from syncing.rw.read import read_json, read_npy
+        for fpath in (files['xl'], files['json']):
+            args = [fpath, '-y', 'y1', '-R', 'Sheet1']
+            for out, dtype in (('sync64.json', 'float64'),
+                               ('sync32.json', 'float32'),
+                               ('sync32.npy', 'float32')):
+                result = self.runner.invoke(
+                    cli.sync, args[:1] + [out] + args[1:] + ['--dtype', dtype]
+                )
+                self.assertEqual(0, result.exit_code, result)
+            data, ref = read_npy('sync32.npy')
+            for v in data.values():
+                self.assertEqual(v.values.dtype, np.float32)
+            data = read_json('sync32.json', dtype='float32')['resampled']
+            self.assertEqual(data.values.dtype, np.float32)
+            with open('sync64.json') as e, open('sync32.json') as r:
+                res, out = json.load(e), json.load(r)
+            self.assertEqual(res['shifts'], out['shifts'])
+            for k, v in sh.stack_nested_keys(res['resampled']):
+                np.testing.assert_allclose(
+                    sh.get_nested_dicts(out['resampled'], *k), v, rtol=1e-6,
+                    atol=1e-5, err_msg=str(k)
+                )
+            shutil.rmtree('sync32.npy')
+
+    def test_excel_columns(self):
+        from syncing.rw.read import read_excel
+        with open(files['sets']) as f:
+            sets_mapping = json.load(f)
+        del sets_mapping['Sheet2']
+        data, ref = read_excel(files['xl'], sets_mapping=sets_mapping)
+        self.assertEqual(ref, 'Sheet1')
+        self.assertEqual(
+            {k: list(v) for k, v in data.items()},
+            {'Sheet1': ['x', 'y1'], 'Sheet3': ['x', 'y1', 'y2']}
+        )
+
+    @ddt.idata((
+            (files['xl'], 0, None),
+            (files['xl'], 0, 'sets'),
+            (files['xl_H'], [0, 1], None),
+    ))
+    def test_excel_engine(self, data):
+        from syncing.rw.read import read_excel
+        fpath, header, sets_mapping = data
+        if sets_mapping:
+            with open(files[sets_mapping]) as f:
+                sets_mapping = json.load(f)
+        res = [read_excel(
+            fpath, header, sets_mapping=sets_mapping, excel_engine=engine
+        ) for engine in ('stream', 'pandas')]
+        self.assertEqual(res[0][1], res[1][1])
+        self.assertEqual(*({k: list(v) for k, v in d.items()} for d, _ in res))
+        for k, v in res[0][0].items():
+            self.assertTrue(v.values.flags.f_contiguous)
+            np.testing.assert_array_equal(v.values, res[1][0][k].values)
+
+    def test_excel_cache(self):
+        from unittest import mock
+        from syncing.rw import read
+        shutil.copy(files['xl_H'], 'cached.xlsx')
+        kw = dict(header=[0, 1], excel_cache_dir='xl_cache')
+        read.read_excel('cached.xlsx', **kw)  # The sidecar is opt-in.
+        self.assertFalse(osp.exists('xl_cache'))
+        kw['excel_cache'] = 'on'
+        parse = mock.Mock(wraps=read._parse_excel)
+        with mock.patch.object(read, '_parse_excel', parse):
+            res = read.read_excel('cached.xlsx', **kw)
+            sidecar = read.excel_sidecar(
+                'cached.xlsx', [0, 1], excel_cache_dir='xl_cache'
+            )
+            self.assertTrue(osp.isfile(osp.join(sidecar, 'source.json')))
+            data, ref = read.read_excel('cached.xlsx', **kw)
+            self.assertEqual(1, parse.call_count)
+            self.assertEqual(res[1], ref)
+            self.assertEqual(
+                {k: list(v) for k, v in res[0].items()},
+                {k: list(v) for k, v in data.items()}
+            )
+            for k, v in res[0].items():
+                np.testing.assert_array_equal(v.values, data[k].values)
+            read.read_excel('cached.xlsx', data_names=['Sheet2'], **kw)
+            self.assertEqual(2, parse.call_count)  # Other options.
+            read.read_excel('cached.xlsx', **dict(kw, excel_cache='refresh'))
+            read.read_excel('cached.xlsx', **dict(kw, excel_cache='off'))
+            self.assertEqual(4, parse.call_count)
+            st = os.stat('cached.xlsx')
+            os.utime('cached.xlsx', ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+            read.read_excel('cached.xlsx', **kw)
+            read.read_excel('cached.xlsx', **kw)
+            self.assertEqual(5, parse.call_count)  # Workbook changed.
+        result = self.runner.invoke(cli.purge_cache, [
+            '--excel-cache-dir', 'xl_cache'
+        ])
+        self.assertEqual(0, result.exit_code)
+        self.assertFalse(osp.exists('xl_cache'))
+
+    def test_profile(self):
+        result = self.runner.invoke(cli.sync, [
+            files['xl'], 'profile.json', '-I', 'cubic', '-M', files['methods'],
+            '-S', files['sets'], '-L', files['labels'], '--profile',
+            'report.json', '--excel-cache', 'off'
+        ])
+        self.assertEqual(0, result.exit_code)
+        with open(osp.join(results_dir, 'sync2.json')) as e, \
+                open('profile.json') as r:
+            self.assertEqual(json.load(e)['shifts'], json.load(r)['shifts'])
+        with open('report.json') as f:
+            report = json.load(f)
+        nodes = {v['node']: v for v in report['nodes']}
+        self.assertLessEqual({
+            'read_data/read_excel', 'parse_data', 'write_data/save_json',
+            'compute_outputs/calculate_shifts', 'compute_outputs/resample_data'
+        }, set(nodes))
+        self.assertEqual(
+            {(v['stage'], v['name']) for v in report['data_sets']},
+            {('read', 'Sheet1'), ('read', 'Sheet2'), ('read', 'Sheet3'),
+             ('shifts', 'Sheet2'), ('shifts', 'Sheet3'),
+             ('resample', 'Sheet2'), ('resample', 'Sheet3')}
+        )
+        for v in report['nodes'] + report['data_sets']:
+            self.assertLessEqual({'wall', 'cpu', 'peak'}, set(v))
+            self.assertLessEqual(v['wall'], report['total']['wall'])
+            self.assertLessEqual(v['peak'], report['total']['peak'])
+
+    def test_sync_batch(self):
+        with open('manifest.csv', 'w') as f:
+            f.write('%s,batch/sync2.json\n' % files['xl'])
+            f.write('none.xlsx,batch/none.json\n')
+        args = ['-I', 'cubic', '-M', files['methods'], '-S', files['sets'],
+                '-L', files['labels'], '--summary', 'summary.json']
+        with open(osp.join(results_dir, 'sync2.json')) as f:
+            res = json.load(f)
+        for workers in ('1', '2'):
+            result = self.runner.invoke(cli.sync_batch, [
+                files['xl'], '-m', 'manifest.csv', '-o', 'batch', '-w', workers
+            ] + args)
+            self.assertEqual(1, result.exit_code)
+            with open('summary.json') as f:
+                summary = {v['output']: v for v in json.load(f)}
+            self.assertEqual(
+                {k: v['status'] for k, v in summary.items()},
+                {osp.join('batch', k): v for k, v in (
+                    ('sync2.json', 'ok'), ('none.json', 'failed'),
+                    ('data.json', 'ok')
+                )}
+            )
+            for fname in ('sync2.json', 'data.json'):
+                with open(osp.join('batch', fname)) as f:
+                    self.assertEqual(res['shifts'], json.load(f)['shifts'])
+            shutil.rmtree('batch')
+
+    @unittest.skipUnless(
+        multiprocessing.get_start_method() == 'fork',
+        'Workers must inherit the patched function.'
+    )
+    def test_sync_batch_crash(self):
+        from unittest import mock
+        from syncing import batch
+        read_inputs = batch.read_inputs
+
+        def crash(inputs):  # Simulates a worker killed by the OS.
+            if inputs['input_fpath'] == 'crash.xlsx':
+                os._exit(1)
+            return read_inputs(inputs)
+
+        jobs = [(files['xl'], 'crash/sync%d.json' % i) for i in range(3)]
+        jobs.insert(1, ('crash.xlsx', 'crash/crash.json'))
+        with mock.patch.object(batch, 'read_inputs', crash):
+            res = list(batch.run_batch(jobs, {'y_label': 'y1'}, workers=2))
+        self.assertEqual(
+            {v['output']: v['status'] for v in res},
+            {'crash/sync0.json': 'ok', 'crash/sync1.json': 'ok',
+             'crash/sync2.json': 'ok', 'crash/crash.json': 'failed'}
+        )
+        self.assertIn('BrokenProcessPool', next(
+            v['error'] for v in res if v['status'] == 'failed'
+        ))
+        shutil.rmtree('crash')
+
+    def test_serve(self):
+        import threading
+        import urllib.request as request
+        from urllib.error import HTTPError
+        from syncing.server import SyncServer
+        server = SyncServer(('127.0.0.1', 0), workers=1, queue_size=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = 'http://127.0.0.1:%d/' % server.server_address[1]
+
+        def post(**inputs):
+            req = request.Request(url + 'sync', json.dumps(inputs).encode())
+            try:
+                with request.urlopen(req) as r:
+                    return r.status, json.load(r)
+            except HTTPError as ex:
+                return ex.code, json.load(ex)
+
+        try:
+            with request.urlopen(url + 'health') as r:
+                self.assertEqual(1, json.load(r)['workers'])
+            with open(osp.join(results_dir, 'sync2.json')) as f:
+                res = json.load(f)
+            kw = dict(
+                input_fpath=files['xl'], interpolation_method='cubic',
+                methods_fpath=files['methods'], labels_fpath=files['labels'],
+                sets_mapping_fpath=files['sets']
+            )
+            status, out = post(**kw)
+            self.assertEqual(200, status)
+            self.assertEqual(res['shifts'], out['shifts'])
+            self.assertEqual(
+                {k: np.round(v, 7).tolist()
+                 for k, v in sh.stack_nested_keys(res['resampled'])},
+                {k: np.round(v, 7).tolist()
+                 for k, v in sh.stack_nested_keys(out['resampled'])}
+            )
+            self.assertEqual(
+                (200, {'written': 'serve.json'}),
+                post(output_fpath='serve.json', **kw)
+            )
+            with open('serve.json') as f:
+                self.assertEqual(res['shifts'], json.load(f)['shifts'])
+            self.assertEqual(400, post(input_fpath='a.xlsx', unknown=1)[0])
+            self.assertEqual(422, post(input_fpath='none.xlsx')[0])
+            server.slots.acquire()  # Simulates a busy server.
+            self.assertEqual(503, post(**kw)[0])
+            server.slots.release()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @unittest.skipIf(os.name == 'nt', 'SIGKILL needed.')
+    def test_serve_crash(self):
+        import signal
+        import threading
+        import urllib.request as request
+        from urllib.error import HTTPError
+        from syncing.server import SyncServer
+        server = SyncServer(('127.0.0.1', 0), workers=1)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = 'http://127.0.0.1:%d/sync' % server.server_address[1]
+
+        def post():
+            req = request.Request(url, json.dumps({
+                'input_fpath': files['xl'], 'y_label': 'y1'
+            }).encode())
+            try:
+                with request.urlopen(req) as r:
+                    return r.status
+            except HTTPError as ex:
+                return ex.code
+
+        try:
+            pool = server.pool
+            for pid in list(pool._processes):  # Simulates an out of memory.
+                os.kill(pid, signal.SIGKILL)
+            self.assertEqual(503, post())
+            self.assertIsNot(pool, server.pool)
+            self.assertEqual(200, post())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets needed.')
+    def test_serve_unix(self):
+        import threading
+        import http.client
+        from syncing.server import SyncServer
+
+        class Connection(http.client.HTTPConnection):
+            def connect(self):
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect('serve.sock')
+
+        server = SyncServer('serve.sock', workers=1)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            self.assertEqual('serve.sock', server.server_name)
+            conn = Connection('localhost')
+            conn.request('GET', '/health')
+            r = conn.getresponse()
+            self.assertEqual((200, 'ok'), (r.status, json.load(r)['status']))
+            conn.close()
+            conn = Connection('localhost')
+            conn.request('POST', '/sync', json.dumps({
+                'input_fpath': files['xl'], 'y_label': 'y1',
+                'output_fpath': 'serve_unix.json'
+            }))
+            r = conn.getresponse()
+            self.assertEqual(200, r.status)
+            self.assertEqual({'written': 'serve_unix.json'}, json.load(r))
+            conn.close()
+            with open(osp.join(results_dir, 'sync.json')) as e, \
+                    open('serve_unix.json') as r:
+                self.assertEqual(
+                    json.load(e)['shifts'], json.load(r)['shifts']
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertFalse(osp.exists('serve.sock'))
+        with open('serve.sock', 'w') as f:  # Not a socket.
+            f.write('data')
+        self.assertRaises(FileExistsError, SyncServer, 'serve.sock')
+        with open('serve.sock') as f:
+            self.assertEqual('data', f.read())
+        os.remove('serve.sock')
+
+    def test_result_cache(self):
+        from unittest import mock
+        from syncing import synchronise
+        from syncing.model import xcorr, cache
+        x = np.arange(0, 100, .1)
+        data = {'ref': {'x': x, 'y': np.sin(x / 3)}}
+        data.update({'s%d' % i: {
+            'x': x + i, 'y': np.sin(x / 3), 'z': x * i
+        } for i in range(1, 4)})
+        kw = dict(interpolation_method='cubic', cache_dir='cache')
+        search = mock.Mock(wraps=xcorr.search)
+        with mock.patch.object(xcorr, 'search', search):
+            res = synchronise(data, **kw)
+            self.assertEqual(3, len(search.call_args[0][1]))
+            self.assertEqual(res[0], synchronise(data, **kw)[0])
+            self.assertEqual(1, search.call_count)  # All results cached.
+            data['s2']['y'] = np.cos(x / 3)
+            shifts, resampled = synchronise(data, **kw)
+            self.assertEqual(2, search.call_count)
+            self.assertEqual(1, len(search.call_args[0][1]))  # Only `s2`.
+        self.assertEqual(res[0]['s1'], shifts['s1'])
+        for k in ('s1', 's3'):
+            for i, v in resampled[k].items():
+                np.testing.assert_array_equal(res[1][k][i], v)
+        methods = {'s3': {'z': 'linear'}}
+        with mock.patch.object(xcorr, 'search', search):
+            res = synchronise(data, methods=methods, **kw)[1]['s3']['z']
+            self.assertEqual(2, search.call_count)  # Shifts are unchanged.
+        kw.pop('cache_dir')
+        np.testing.assert_array_equal(
+            synchronise(data, methods=methods, **kw)[1]['s3']['z'], res
+        )
+        kw['cache_dir'] = 'cache'
+        for i in range(2):  # Custom functions are not cached.
+            methods = {'s3': {'z': lambda x, xp, fp, i=i: np.full(len(x), i)}}
+            res = synchronise(data, methods=methods, **kw)[1]['s3']['z']
+            np.testing.assert_array_equal(res, i)
+
+        c = cache.ResultCache('cache')
+        c = cache.ResultCache('cache', c.size / 2 ** 21)  # Half size.
+        c.set(c.key('new'), np.zeros(10))
+        self.assertLessEqual(c.size, c.max_size)
+        self.assertEqual(0.0, c.get(c.key('new'))[0])  # Newest is kept.
+        fpath = c._fpath(c.key('new'))
+        with open(fpath, 'r+b') as f:  # Interrupted write.
+            f.truncate(10)
+        self.assertIsNone(c.get(c.key('new')))
+        self.assertFalse(osp.exists(fpath))
+        shutil.rmtree('cache')
+
+    def test_synchronise(self):
+        import syncing
+        from syncing.rw.read import read_excel
+        with open(files['methods']) as f:
+            methods = json.load(f)
+        with open(files['sets']) as f:
+            sets_mapping = json.load(f)
+        with open(files['labels']) as f:
+            labels = json.load(f)
+        kw = dict(interpolation_method='cubic', sets_mapping=sets_mapping,
+                  labels=labels, methods=methods)
+        data, ref = read_excel(files['xl'])
+        with open(osp.join(results_dir, 'sync2.json')) as f:
+            res = json.load(f)
+        shifts, resampled = syncing.synchronise(data, ref, **kw)
+        self.assertEqual(res['shifts'], shifts)
+        self.assertEqual(
+            {k: np.round(v, 7).tolist()
+             for k, v in sh.stack_nested_keys(res['resampled'])},
+            {k: np.round(v, 7).tolist()
+             for k, v in sh.stack_nested_keys(resampled)}
+        )
+
+        frames = {k: pd.DataFrame(dict(v)) for k, v in data.items()}
+        shifts, resampled = syncing.synchronise(frames, **kw)
+        self.assertEqual(res['shifts'], shifts)
+        for k, v in resampled.items():
+            self.assertIsInstance(v, pd.DataFrame)
+            for i, u in v.items():
+                np.testing.assert_allclose(
+                    u, res['resampled'][k][i], atol=1e-12
+                )
+
+        for k, v in (('reference_name', 'none'), ('y_label', 'none'),
+                     ('interpolation_method', 'none'), ('max_shift', -1)):
+            with self.assertRaises(ValueError):
+                syncing.synchronise(data, **{k: v})
+        with self.assertRaises(ValueError):
+            syncing.model.calculate_shifts(
+                syncing.model.define_labels(), 'Sheet1', data, max_shift=-1
+            )
+
+    def test_lazy_startup(self):
+        import sys
+        import subprocess
+        heavy = {'numpy', 'scipy', 'pandas', 'syncing.process',
+                 'syncing.model'}
+        res = subprocess.run([
+            sys.executable, '-c',
+            'import sys, syncing.cli; print(sorted(set(sys.modules) & %r))' %
+            heavy
+        ], check=True, capture_output=True, text=True,
+            cwd=osp.dirname(test_dir))
+        self.assertEqual(res.stdout.strip(), '[]')
+
+        # The sub-packages are still reachable as attributes.
+        subprocess.run([
+            sys.executable, '-c',
+            'import syncing; syncing.model.dsp, syncing.rw.file_ext, '
+            'syncing.read.dsp, syncing.write.dsp'
+        ], check=True, cwd=osp.dirname(test_dir))
+
+    def test_excel_writer(self):
+        import openpyxl
+        from syncing.rw.write import save_excel
+        from syncing.model.dataset import DataSet
+        a = np.arange(6.).reshape(3, 2)
+        a[1, 1], a[2, 0] = np.nan, np.inf
+        outputs = {
+            'shifts': {'b': 1.5},
+            'resampled': {'a': DataSet(a, ['x', 'y']),
+                          'b': DataSet(np.ones((3, 1)), ['z'])},
+            'data': {
+                'a': DataSet(a, ['x', 'y']),
+                'b': {'k': {'x': np.arange(2.), 'y': np.ones(2)},
+                      'j': {'x': np.arange(2.)}},
+                'c': DataSet(np.ones((2, 3)), [('a', 'b'), ('a', 'c'),
+                                                ('d', 'c')])
+            }
+        }
+
+        def cells(fpath):
+            wb = openpyxl.load_workbook(fpath)
+            return {ws.title: (sorted(map(str, ws.merged_cells.ranges)), [[
+                (c.value, c.font.b, c.border.top.style, c.alignment.horizontal)
+                for c in row if c.value is not None
+            ] for row in ws.iter_rows()]) for ws in wb}
+
+        res = [cells(save_excel('%s.xlsx' % engine, outputs, engine))
+               for engine in ('stream', 'pandas')]
+        self.assertEqual(list(res[0]), list(res[1]))
+        self.assertEqual(*res)
+
+    def test_json_writer(self):
+        from syncing.rw.read import read_json
+        from syncing.rw.write import save_json, _json_default
+        from syncing.model.dataset import DataSet
+        a = np.random.default_rng(0).normal(size=(100001, 2))
+        a[1, 1], a[2, 0], a[3, 0] = np.nan, np.inf, -np.inf
+        outputs = {
+            'shifts': {'b': 1.5, 'c': np.float64(-2)},
+            'resampled': {'a': DataSet(a, ['x', 'y']),
+                          'b': {'i': np.arange(3), 'j': {'k': np.ones(2)}},
+                          'c': {}}
+        }
+        with open(save_json('stream.json', outputs)) as f:
+            self.assertEqual(f.read(), json.dumps(
+                outputs, default=_json_default
+            ))
+        res = read_json('stream.json', ['resampled'])['resampled']
+        for k in ('x', 'y'):
+            np.testing.assert_array_equal(res['a', k], a[:, 'xy'.index(k)])
+
+        save_json('compact.json', outputs, json_precision=4, json_compact=True)
+        with open('compact.json') as f:
+            res = json.load(f)
+        self.assertEqual(res['resampled']['b'], {'i': [0, 1, 2], 'j': {
+            'k': [1, 1]
+        }})
+        np.testing.assert_allclose(res['resampled']['a']['x'], a[:, 0], 1e-3)
+
+    def test_json_reader(self):
+        from syncing.rw.read import read_json
+        data = {
+            'a': {'x': [1.5, float('nan'), float('inf'), -1e-300],
+                  'y': [0, 1, 2, 3], 'z': {'k': [[1, 2], [3, 4]]}},
+            'b': {'x': [1, 'a"]', {'}': []}], 'y': 'text'},
+            'c': {'x': [], 'y': [True, None]}
+        }
+        with open('data.json', 'w') as f:
+            json.dump(data, f, indent=1)
+        res = read_json('data.json')
+        self.assertEqual(list(res), ['a', 'b', 'c'])
+        self.assertEqual(res['a']['y'].tolist(), [0, 1, 2, 3])
+        np.testing.assert_array_equal(res['a']['x'], data['a']['x'])
+        self.assertEqual(res['a'][('z', 'k')].tolist(), [[1, 2], [3, 4]])
+        self.assertEqual(res['c']['y'].tolist(), [True, None])
+        self.assertEqual(res['c']['x'].shape, (0,))
+
+        res = read_json('data.json', ['a', 'c'])
+        self.assertEqual(list(res), ['a', 'c'])
+        self.assertEqual(res['a']['x'].dtype, float)
+
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+        from syncing.rw.read import read_excel, read_parquet
+        from syncing.rw.write import save_parquet
+        save_parquet('data.parquet', {'resampled': read_excel(files['xl'])[0]})
+        for args, fname in (
+                (['-y', 'y1'], 'sync.json'),
+                (['-I', 'cubic', '-M', files['methods'], '-S', files['sets'],
+                  '-L', files['labels']], 'sync2.json')):
+            args = ['data.parquet', 'sync.parquet'] + args
+            self.assertEqual(0, self.runner.invoke(cli.sync, args).exit_code)
+            with open(osp.join(results_dir, fname)) as f:
+                res = json.load(f)
+            data, ref = read_parquet('sync.parquet')
+            self.assertEqual(ref, 'Sheet1')
+            for k, v in res['shifts'].items():
+                fpath = osp.join('sync.parquet', '%s.parquet' % k)
+                meta = pq.read_schema(fpath).metadata[b'syncing']
+                self.assertEqual(v, json.loads(meta)['shift'])
+            self.assertEqual(
+                {k: np.round(v, 7).tolist()
+                 for k, v in sh.stack_nested_keys(res['resampled'])},
+                {k: np.round(v, 7).tolist()
+                 for k, v in sh.stack_nested_keys(data)}
+            )
+            shutil.rmtree('sync.parquet')
+
+        data, ref = read_parquet('data.parquet', ['Sheet2', 'Sheet1'], {
+            'Sheet2': {'a': 'y2', 'x': 'x'}
+        })
+        self.assertEqual(ref, 'Sheet2')
+        self.assertEqual(list(data), ['Sheet2'])
+        self.assertEqual(data['Sheet2'].columns, ['y2', 'x'])
+
+    def test_csv(self):
+        from syncing.rw.read import read_excel, read_csv
+        os.makedirs('data', exist_ok=True)
+        for k, v in read_excel(files['xl'])[0].items():
+            pd.DataFrame(dict(v)).to_csv(
+                osp.join('data', '%s.csv' % k), index=False
+            )
+        for args, fname in (
+                (['-y', 'y1'], 'sync.json'),
+                (['-I', 'cubic', '-M', files['methods'], '-S', files['sets'],
+                  '-L', files['labels']], 'sync2.json')):
+            with open(osp.join(results_dir, fname)) as f:
+                res = json.load(f)
+            self.assertEqual(0, self.runner.invoke(
+                cli.sync, ['data', 'sync.csv'] + args
+            ).exit_code)
+            shifts = pd.read_csv(
+                osp.join('sync.csv', 'shifts.csv'), header=None, index_col=0
+            )[1].to_dict()
+            self.assertEqual(res['shifts'], shifts)
+            df = pd.read_csv(
+                osp.join('sync.csv', 'synced.csv'), header=[0, 1], index_col=0
+            )
+            self.assertEqual(
+                {k: np.round(v, 7).tolist()
+                 for k, v in sh.stack_nested_keys(res['resampled'])},
+                {k: np.round(v.values, 7).tolist() for k, v in df.items()}
+            )
+            shutil.rmtree('sync.csv')
+
+        data, ref = read_csv(
+            osp.join('data', '*.csv'), 0, ['Sheet2', 'Sheet1'],
+            {'Sheet2': {'a': 'y2', 'x': 'x'}}
+        )
+        self.assertEqual(ref, 'Sheet2')
+        self.assertEqual(list(data), ['Sheet2'])
+        self.assertEqual(data['Sheet2'].columns, ['x', 'y2'])
+        with self.assertRaisesRegex(ValueError, 'No CSV files match'):
+            read_csv(osp.join('data', 'none*.csv'))
+
     @ddt.idata((
             ([], 0, cli.template.params[0].default),
             (['sub/template.xlsx'], 0, 'sub/template.xlsx'),